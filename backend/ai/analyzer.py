@@ -2,23 +2,53 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import re
 
+from app_logging import get_logger
+
+logger = get_logger('ai.analyzer')
+
 sentiment_analyzer = None
 
 def get_analyzer():
     global sentiment_analyzer
     if sentiment_analyzer is None:
-        print("Loading AI model... this may take a moment.")
+        logger.info("Loading AI model... this may take a moment.")
         try:
             from transformers import pipeline
             sentiment_analyzer = pipeline("sentiment-analysis", model="cardiffnlp/twitter-roberta-base-sentiment-latest")
-            print("AI model loaded successfully.")
-        except Exception as e:
-            print(f"Primary model failed to load: {e}. Falling back to default model.")
+            logger.info("AI model loaded successfully.")
+        except Exception:
+            logger.warning("Primary model failed to load; falling back to default model", exc_info=True)
             # Fallback to a simpler model if the above fails
             sentiment_analyzer = pipeline("sentiment-analysis")
-            print("Default AI model loaded.")
+            logger.info("Default AI model loaded.")
     return sentiment_analyzer
 
+def _urgency_from_result(result):
+    label = result['label'].upper()
+    confidence = result['score']
+    
+    # Map sentiment to urgency
+    if 'NEGATIVE' in label:
+        return 'high'
+    elif 'NEUTRAL' in label:
+        return 'medium'
+    else:
+        # POSITIVE sentiment
+        if confidence > 0.9: # Very positive might be a thank you or non-issue
+            return 'low'
+        return 'medium'
+
+def _keyword_urgency(text):
+    # Fallback to keyword-based analysis
+    negative_keywords = ['broken', 'dirty', 'urgent', 'emergency', 'dangerous', 'not working', 'damaged']
+    text_lower = text.lower()
+    
+    for keyword in negative_keywords:
+        if keyword in text_lower:
+            return 'high'
+    
+    return 'medium'
+
 def analyze_sentiment(text):
     """
     Analyze sentiment and return urgency level
@@ -28,30 +58,19 @@ def analyze_sentiment(text):
     """
     analyzer = get_analyzer()
     try:
-        result = analyzer(text)[0]
-        label = result['label'].upper()
-        confidence = result['score']
-        
-        # Map sentiment to urgency
-        if 'NEGATIVE' in label:
-            return 'high'
-        elif 'NEUTRAL' in label:
-            return 'medium'
-        else:
-            # POSITIVE sentiment
-            if confidence > 0.9: # Very positive might be a thank you or non-issue
-                return 'low'
-            return 'medium'
+        return _urgency_from_result(analyzer(text)[0])
     except:
-        # Fallback to keyword-based analysis
-        negative_keywords = ['broken', 'dirty', 'urgent', 'emergency', 'dangerous', 'not working', 'damaged']
-        text_lower = text.lower()
-        
-        for keyword in negative_keywords:
-            if keyword in text_lower:
-                return 'high'
-        
-        return 'medium'
+        return _keyword_urgency(text)
+
+def analyze_sentiment_batch(texts, batch_size=8):
+    """
+    Urgency for many texts, letting the model run them in batches of batch_size
+    """
+    analyzer = get_analyzer()
+    try:
+        return [_urgency_from_result(r) for r in analyzer(list(texts), batch_size=batch_size)]
+    except:
+        return [_keyword_urgency(text) for text in texts]
 
 def categorize_issue(text):
     """
@@ -99,12 +118,13 @@ def categorize_issue(text):
     
     return 'general'
 
-def check_duplicate(new_text, existing_descriptions, threshold=0.8):
+def find_duplicates(new_text, existing_descriptions, threshold=0.8):
     """
-    Check if the new issue is a duplicate using TF-IDF and cosine similarity
+    Indices of existing descriptions the new text duplicates (TF-IDF cosine
+    similarity above threshold), most similar first
     """
     if not existing_descriptions:
-        return False
+        return []
     
     try:
         # Combine new text with existing descriptions
@@ -120,14 +140,18 @@ def check_duplicate(new_text, existing_descriptions, threshold=0.8):
         
         similarities = cosine_similarity(new_text_vector, existing_vectors).flatten()
         
-        # Check if any similarity exceeds threshold
-        max_similarity = max(similarities) if len(similarities) > 0 else 0
-        
-        return bool(max_similarity > threshold)
+        matches = [i for i in range(len(similarities)) if similarities[i] > threshold]
+        return sorted(matches, key=lambda i: similarities[i], reverse=True)
     
-    except Exception as e:
-        print(f"Error in duplicate detection: {e}")
-        return False
+    except Exception:
+        logger.exception("Error in duplicate detection")
+        return []
+
+def check_duplicate(new_text, existing_descriptions, threshold=0.8):
+    """
+    Check if the new issue is a duplicate using TF-IDF and cosine similarity
+    """
+    return bool(find_duplicates(new_text, existing_descriptions, threshold))
 
 def preprocess_text(text):
     """
@@ -0,0 +1,207 @@
+"""
+Benchmark and evaluation harness for ai/analyzer.py.
+
+Measures per-call latency distributions, batched throughput and peak memory of
+analyze_sentiment, categorize_issue and check_duplicate, plus accuracy / F1 for
+urgency, category and duplicate detection against the labeled synthetic corpus.
+Results are written as sorted JSON so two runs can be diffed.
+
+Usage (from backend/):
+    python -m ai.benchmark --stub --output bench_ai.json
+    python -m ai.benchmark --n 500 --batch-sizes 1,8,32
+"""
+import argparse
+import json
+import platform
+import resource
+import statistics
+import time
+import tracemalloc
+
+from ai import analyzer
+from ai.benchmark_corpus import generate
+
+
+class StubSentiment:
+    """
+    Deterministic stand-in for the transformers pipeline so the harness runs offline.
+    Accepts a string or a list like the real pipeline and returns the same shape.
+    Only latency and throughput are meaningful with it; urgency accuracy is not reported.
+    """
+    NEGATIVE = ('broken', 'dangerous', 'emergency', 'hazard', 'stolen', 'terrible', 'suspicious', 'overflowing')
+    POSITIVE = ('thank', 'nice', 'lovely', 'great', 'suggestion', 'consider')
+
+    def _classify(self, text):
+        text = text.lower()
+        if any(word in text for word in self.NEGATIVE):
+            return {'label': 'negative', 'score': 0.95}
+        if any(word in text for word in self.POSITIVE):
+            return {'label': 'positive', 'score': 0.97}
+        return {'label': 'neutral', 'score': 0.8}
+
+    def __call__(self, texts, batch_size=None):
+        if isinstance(texts, str):
+            return [self._classify(texts)]
+        return [self._classify(text) for text in texts]
+
+
+def latency_stats(samples_ms):
+    ordered = sorted(samples_ms)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 4),
+        'p50_ms': round(pct(50), 4),
+        'p90_ms': round(pct(90), 4),
+        'p99_ms': round(pct(99), 4),
+        'max_ms': round(ordered[-1], 4),
+    }
+
+
+def timed_calls(func, inputs):
+    samples = []
+    outputs = []
+    for args in inputs:
+        start = time.perf_counter()
+        outputs.append(func(*args))
+        samples.append((time.perf_counter() - start) * 1000)
+    return outputs, latency_stats(samples)
+
+
+def classification_report(truth, predicted):
+    labels = sorted(set(truth) | set(predicted))
+    per_label = {}
+    for label in labels:
+        tp = sum(1 for t, p in zip(truth, predicted) if t == label and p == label)
+        fp = sum(1 for t, p in zip(truth, predicted) if t != label and p == label)
+        fn = sum(1 for t, p in zip(truth, predicted) if t == label and p != label)
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        per_label[str(label)] = {
+            'precision': round(precision, 4),
+            'recall': round(recall, 4),
+            'f1': round(f1, 4),
+            'support': tp + fn,
+        }
+    supported = [v for v in per_label.values() if v['support']]
+    return {
+        'accuracy': round(sum(1 for t, p in zip(truth, predicted) if t == p) / len(truth), 4),
+        'macro_f1': round(statistics.fmean(v['f1'] for v in supported), 4) if supported else 0.0,
+        'per_label': per_label,
+    }
+
+
+def throughput(texts, batch_sizes):
+    results = {}
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+            analyzer.analyze_sentiment_batch(batch, batch_size=batch_size)
+            for text in batch:
+                analyzer.categorize_issue(text)
+        elapsed = time.perf_counter() - start
+        results[str(batch_size)] = {
+            'items_per_sec': round(len(texts) / elapsed, 2),
+            'total_ms': round(elapsed * 1000, 2),
+        }
+    return results
+
+
+def run(n, seed, batch_sizes, stub, duplicate_window):
+    if stub:
+        analyzer.sentiment_analyzer = StubSentiment()
+
+    corpus = generate(n=n, seed=seed)
+    texts = [item['description'] for item in corpus]
+
+    load_start = time.perf_counter()
+    analyzer.get_analyzer()
+    model_load_ms = (time.perf_counter() - load_start) * 1000
+
+    urgency_pred, urgency_latency = timed_calls(analyzer.analyze_sentiment, [(t,) for t in texts])
+    category_pred, category_latency = timed_calls(analyzer.categorize_issue, [(t,) for t in texts])
+    # Each report is checked against the ones before it, like create_issue does
+    duplicate_inputs = [(t, texts[max(0, i - duplicate_window):i]) for i, t in enumerate(texts)]
+    duplicate_pred, duplicate_latency = timed_calls(analyzer.check_duplicate, duplicate_inputs)
+    throughput_results = throughput(texts, batch_sizes)
+
+    # tracemalloc slows allocation-heavy calls several times over, so memory gets its own untimed pass
+    tracemalloc.start()
+    for text, existing in duplicate_inputs:
+        analyzer.analyze_sentiment(text)
+        analyzer.categorize_issue(text)
+        analyzer.check_duplicate(text, existing)
+    _, peak_python_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # An item is a true duplicate if anything in its window belongs to the same group
+    group = []
+    for item in corpus:
+        group.append(group[item['duplicate_of']] if item['duplicate_of'] is not None else item['id'])
+    duplicate_truth = [
+        group[i] in group[max(0, i - duplicate_window):i]
+        for i in range(len(corpus))
+    ]
+
+    return {
+        'config': {
+            'n': n,
+            'seed': seed,
+            'batch_sizes': batch_sizes,
+            'stub_model': stub,
+            'duplicate_window': duplicate_window,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'accuracy': {
+            # The stub keys on the corpus templates' own words, so its urgency score would always be 1.0
+            'urgency': None if stub else classification_report([c['urgency'] for c in corpus], urgency_pred),
+            'category': classification_report([c['category'] for c in corpus], category_pred),
+            'duplicate': classification_report(duplicate_truth, duplicate_pred),
+        },
+        'latency': {
+            'model_load_ms': round(model_load_ms, 2),
+            'analyze_sentiment': urgency_latency,
+            'categorize_issue': category_latency,
+            'check_duplicate': duplicate_latency,
+        },
+        'throughput': throughput_results,
+        'memory': {
+            'peak_python_mb': round(peak_python_bytes / 1024 / 1024, 2),
+            # ru_maxrss is KiB on Linux; includes native allocations (torch, numpy)
+            'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n', type=int, default=300, help='corpus size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-sizes', default='1,8,32')
+    parser.add_argument('--duplicate-window', type=int, default=200,
+                        help='how many earlier reports each duplicate check compares against')
+    parser.add_argument('--stub', action='store_true', help='use a deterministic stub instead of the transformer model')
+    parser.add_argument('--output', help='write JSON results here (default: stdout)')
+    args = parser.parse_args()
+
+    batch_sizes = [int(b) for b in args.batch_sizes.split(',') if b]
+    results = run(args.n, args.seed, batch_sizes, args.stub, args.duplicate_window)
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+        print(f"Results written to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Labeled synthetic corpus of campus issue descriptions for the analyzer benchmark.
+
+Each example is built from a template whose category and urgency are known, so the
+corpus is fully reproducible from a seed. A share of examples are light rewrites of
+an earlier one, and repeats of the same template at the same place also occur; both
+are labeled as duplicates of the earlier example.
+"""
+import random
+
+PLACES = [
+    'Block A', 'the library', 'the main canteen', 'hostel 3', 'the physics lab',
+    'the sports complex', 'lecture hall 2', 'the admin building', 'the parking lot',
+    'the computer centre', 'girls hostel', 'the auditorium'
+]
+
+# (category, urgency, template)
+TEMPLATES = [
+    ('sanitation', 'high', "The washroom in {place} is overflowing and extremely dirty, it is a health hazard"),
+    ('sanitation', 'high', "Garbage has not been collected from {place} for a week and the smell is terrible"),
+    ('sanitation', 'medium', "Water is leaking from a pipe near {place}, please send a plumber"),
+    ('sanitation', 'low', "Could the dustbins near {place} be emptied a little more often? Thanks for keeping it clean"),
+    ('infrastructure', 'high', "The stairs railing at {place} is broken and someone could fall, this is dangerous"),
+    ('infrastructure', 'medium', "A window pane in {place} is cracked and needs replacement"),
+    ('infrastructure', 'medium', "Several chairs in {place} are wobbly and need repair"),
+    ('infrastructure', 'low', "It would be nice to repaint the gate at {place} when there is time"),
+    ('electrical', 'high', "Exposed live wires near the socket in {place}, this is an emergency"),
+    ('electrical', 'medium', "The projector in {place} does not turn on"),
+    ('electrical', 'medium', "Wifi keeps disconnecting in {place} during the evening"),
+    ('electrical', 'low', "Please consider adding a couple more charging points in {place}, would be great"),
+    ('security', 'high', "My bike was stolen from {place} and the cctv there is not working"),
+    ('security', 'high', "A suspicious stranger has been following students near {place} at night"),
+    ('security', 'medium', "The door lock of the storage room in {place} is jammed"),
+    ('general', 'medium', "The notice board at {place} has outdated information"),
+    ('general', 'low', "Thank you for the new benches outside, a few more near {place} would be lovely"),
+    ('general', 'low', "Suggestion: put up signage to {place} for new students"),
+]
+
+REWRITES = [
+    lambda text: text.lower(),
+    lambda text: "Again: " + text,
+    lambda text: text + ". Please look into it.",
+    lambda text: text.replace(' the ', ' that '),
+]
+
+
+def generate(n=300, seed=0, duplicate_rate=0.15):
+    """
+    Returns a list of dicts with id, description, category, urgency and duplicate_of
+    (the id of an earlier example it repeats, or None).
+    """
+    rng = random.Random(seed)
+    corpus = []
+    seen = {}
+    for i in range(n):
+        if corpus and rng.random() < duplicate_rate:
+            source = rng.choice(corpus)
+            corpus.append({
+                'id': i,
+                'description': rng.choice(REWRITES)(source['description']),
+                'category': source['category'],
+                'urgency': source['urgency'],
+                'duplicate_of': source['id']
+            })
+            continue
+        template_index = rng.randrange(len(TEMPLATES))
+        place = rng.choice(PLACES)
+        category, urgency, template = TEMPLATES[template_index]
+        corpus.append({
+            'id': i,
+            'description': template.format(place=place),
+            'category': category,
+            'urgency': urgency,
+            # The same problem at the same place is a duplicate even when worded identically
+            'duplicate_of': seen.get((template_index, place))
+        })
+        seen.setdefault((template_index, place), i)
+    return corpus
@@ -0,0 +1,41 @@
+class UnionFind:
+    """
+    Disjoint sets of issue ids. The root of each set is its canonical issue: when two
+    sets merge, the root that sorts first by key (e.g. the oldest issue) wins.
+
+    The issues table stores the same structure fully compressed: every row's
+    cluster_id points straight at its root, so find() there is a column read and a
+    union is one batched relabel of the losing clusters.
+    """
+    def __init__(self, key=None):
+        self._parent = {}
+        self._key = key or (lambda item: item)
+
+    def add(self, item):
+        self._parent.setdefault(item, item)
+
+    def find(self, item):
+        self.add(item)
+        root = item
+        while self._parent[root] != root:
+            root = self._parent[root]
+        # Path compression
+        while self._parent[item] != root:
+            self._parent[item], item = root, self._parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self._key(root_b) < self._key(root_a):
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        return root_a
+
+    def groups(self):
+        """{root: [members...]} for every set, roots included"""
+        result = {}
+        for item in self._parent:
+            result.setdefault(self.find(item), []).append(item)
+        return result
@@ -12,10 +12,15 @@ from routes.auth import auth_bp
 from routes.issues import issues_bp
 from routes.admin import admin_bp
 from routes.analytics import analytics_bp
+from http_cache import init_compression
+from serialization import init_json
+from app_logging import init_logging
+from db_resilience import init_resilience
 
 load_dotenv()
 
 app = Flask(__name__)
+init_json(app)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB limit
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET', 'your-secret-key')
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=7)
@@ -23,6 +28,9 @@ app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=7)
 jwt = JWTManager(app)
 # Allow all origins for development
 CORS(app, resources={r"/*": {"origins": "*"}})
+init_compression(app)
+init_logging(app)
+init_resilience(app)
 
 # Supabase connection
 try:
@@ -0,0 +1,171 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+
+from flask import request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# Fraction of DEBUG records kept; INFO and above are never sampled
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', 0.1))
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+
+ROOT_LOGGER = 'campusfix'
+
+# request_id / user_id / route / stage timings of the request being served. A contextvar
+# rather than flask.g so query_executor workers (which copy the context) log them too.
+_log_context = contextvars.ContextVar('log_context', default=None)
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+def get_logger(name):
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Runs in the calling thread: stamps request id, user id and route on the record
+    and drops most DEBUG records (pass extra={'sample': False} to always keep one).
+    """
+    def filter(self, record):
+        if record.levelno == logging.DEBUG and getattr(record, 'sample', True):
+            if random.random() >= LOG_DEBUG_SAMPLE_RATE:
+                return False
+        ctx = _log_context.get()
+        if ctx:
+            record.request_id = ctx['request_id']
+            record.user_id = ctx['user_id']
+            record.route = ctx['route']
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks a request thread: when the queue is full the record is dropped and counted."""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Render exceptions here, while the traceback is still alive; the rest is left to the formatter
+        if record.exc_info:
+            record.exc_text = ''.join(traceback.format_exception(*record.exc_info))
+            record.exc_info = None
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and key != 'sample' and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+_listener = None
+_handler = None
+
+
+def configure_logging():
+    """Route campusfix.* loggers through a bounded queue to a background stdout writer."""
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _handler = DroppingQueueHandler(log_queue)
+    _handler.addFilter(RequestContextFilter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(_handler)
+    root.propagate = False
+
+
+def dropped_records():
+    return _handler.dropped if _handler else 0
+
+
+@contextmanager
+def stage(name):
+    """Time a stage of the current request; timings go out with the request log line."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        ctx = _log_context.get()
+        if ctx is not None:
+            ctx['stage_ms'][name] = round((time.perf_counter() - start) * 1000, 2)
+
+
+def init_logging(app):
+    configure_logging()
+    access_log = get_logger('request')
+
+    @app.before_request
+    def start_request():
+        user_id = None
+        try:
+            # Identity is only for log lines; routes still enforce auth themselves
+            verify_jwt_in_request(optional=True)
+            user_id = get_jwt_identity()
+        except Exception:
+            pass
+        _log_context.set({
+            'request_id': request.headers.get('X-Request-ID') or uuid.uuid4().hex,
+            'user_id': user_id,
+            'route': request.url_rule.rule if request.url_rule else request.path,
+            'start': time.perf_counter(),
+            'stage_ms': {}
+        })
+
+    @app.after_request
+    def log_request(response):
+        ctx = _log_context.get()
+        if ctx is None:
+            return response
+        response.headers['X-Request-ID'] = ctx['request_id']
+        access_log.info('request', extra={
+            'method': request.method,
+            'status': response.status_code,
+            'duration_ms': round((time.perf_counter() - ctx['start']) * 1000, 2),
+            'stage_ms': ctx['stage_ms'] or None,
+        })
+        return response
+
+    @app.teardown_request
+    def end_request(exc):
+        _log_context.set(None)
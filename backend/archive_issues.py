@@ -0,0 +1,33 @@
+"""
+Archive resolved issues older than ARCHIVE_AFTER_DAYS (default 180).
+
+Moves them in batches from issues to issues_archive and folds them into
+issue_rollups, so hot-path queries scan only live issues while analytics keep
+counting the archived ones. Meant to run from cron, e.g. nightly.
+Usage: python archive_issues.py [days]
+"""
+import os
+import sys
+
+from models.issue import Issue
+
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 180))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 5000))
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else ARCHIVE_AFTER_DAYS
+    total = 0
+    while True:
+        moved = Issue.archive_resolved(days, ARCHIVE_BATCH_SIZE)
+        if moved is None:
+            print("Archival stopped after an error")
+            break
+        total += moved
+        if moved < ARCHIVE_BATCH_SIZE:
+            break
+    print(f"Archived {total} resolved issues older than {days} days")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Rebuild duplicate clusters for existing issues.
+
+Issues reported before clustering only carry a bare is_duplicate flag. This compares
+every description with the ones reported before it (same TF-IDF similarity as
+create_issue), unions matches, and writes cluster_id / canonical_id so each cluster
+is rooted at its oldest issue. Usage: python backfill_clusters.py [--dry-run]
+"""
+import sys
+from datetime import datetime
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from supabase_client import supabase
+from ai.clustering import UnionFind
+
+THRESHOLD = 0.8
+CHUNK = 1000
+WRITE_BATCH = 200
+
+
+def main():
+    dry_run = '--dry-run' in sys.argv
+    issues = supabase.table('issues').select('id, description, created_at').order('created_at').execute().data
+    if len(issues) < 2:
+        print("Nothing to cluster")
+        return
+
+    order = {issue['id']: i for i, issue in enumerate(issues)}
+    clusters = UnionFind(key=order.get)
+    for issue in issues:
+        clusters.add(issue['id'])
+
+    tfidf = TfidfVectorizer(stop_words='english', lowercase=True).fit_transform(
+        [issue['description'] or '' for issue in issues]
+    )
+    for start in range(0, len(issues), CHUNK):
+        end = min(start + CHUNK, len(issues))
+        # Only compare against earlier issues, like create_issue does
+        similarities = cosine_similarity(tfidf[start:end], tfidf[:end], dense_output=False).tocoo()
+        for row, col, value in zip(similarities.row, similarities.col, similarities.data):
+            i = start + row
+            if col < i and value > THRESHOLD:
+                clusters.union(issues[col]['id'], issues[i]['id'])
+
+    groups = {root: members for root, members in clusters.groups().items() if len(members) > 1}
+    print(f"{len(issues)} issues, {len(groups)} clusters with duplicates")
+    if dry_run:
+        return
+
+    for root, members in groups.items():
+        duplicates = [m for m in members if m != root]
+        for i in range(0, len(duplicates), WRITE_BATCH):
+            supabase.table('issues').update({
+                'cluster_id': root,
+                'canonical_id': root,
+                'is_duplicate': True,
+                # So My Reports delta sync picks up the new duplicate flag
+                'updated_at': datetime.utcnow().isoformat()
+            }).in_('id', duplicates[i:i + WRITE_BATCH]).execute()
+    print("Clusters written")
+
+
+if __name__ == '__main__':
+    main()
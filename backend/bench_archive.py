@@ -0,0 +1,55 @@
+"""
+Time the hot-path issue queries, to compare before and after archival.
+
+Run once before archive_issues.py and once after, writing JSON each time, then
+compare the two files.
+Usage: python bench_archive.py [rounds] [--output results.json]
+"""
+import json
+import statistics
+import sys
+import time
+
+from models.issue import Issue
+
+QUERIES = {
+    'find_all': Issue.find_all,
+    'get_duplicate_candidates': Issue.get_duplicate_candidates,
+    'get_analytics': Issue.get_analytics,
+    'get_category_stats': Issue.get_category_stats,
+    'get_urgency_stats': Issue.get_urgency_stats,
+    'get_trend_data': Issue.get_trend_data,
+}
+
+
+def main():
+    args = sys.argv[1:]
+    output = None
+    if '--output' in args:
+        i = args.index('--output')
+        output = args[i + 1]
+        del args[i:i + 2]
+    rounds = int(args[0]) if args else 10
+
+    results = {}
+    for name, query in QUERIES.items():
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            data = query()
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        results[name] = {
+            'rows': len(data),
+            'p50_ms': round(statistics.median(samples), 2),
+            'max_ms': round(samples[-1], 2),
+        }
+        print(f"{name:<26} rows={len(data):>7}  p50={results[name]['p50_ms']:8.1f}ms  max={results[name]['max_ms']:8.1f}ms")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
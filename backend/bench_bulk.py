@@ -0,0 +1,51 @@
+"""
+Per-issue status updates (the PUT /issues/<id>/status path) vs Issue.update_status_bulk.
+
+Flips up to N non-resolved issues between 'pending' and 'in_progress' on the configured
+Supabase project and restores their original status afterwards; no points are awarded.
+Usage: python bench_bulk.py [batch_size]
+"""
+import sys
+import time
+
+from supabase_client import supabase
+from models.issue import Issue
+from models.user import User
+
+
+def per_issue(admin_id, issue_ids, status):
+    for issue_id in issue_ids:
+        User.find_by_id(admin_id)
+        issue = Issue.get_by_id(issue_id)
+        Issue.update_status(issue_id, status, issue['status'] if issue else None)
+
+
+def bulk(admin_id, issue_ids, status):
+    User.find_by_id(admin_id)
+    Issue.update_status_bulk(issue_ids, status)
+
+
+def main():
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    admin = User.find_by_email('admin@campusfix.com')
+    rows = supabase.table('issues').select('id, status').neq('status', 'resolved').limit(batch_size).execute().data
+    if not admin or not rows:
+        print("Need the admin user and some unresolved issues")
+        return
+
+    issue_ids = [row['id'] for row in rows]
+    print(f"batch of {len(issue_ids)} issues")
+    try:
+        for name, func in [('per-issue', per_issue), ('bulk', bulk)]:
+            for status in ('in_progress', 'pending'):
+                start = time.perf_counter()
+                func(admin['id'], issue_ids, status)
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"{name:<10} -> {status:<12} {elapsed:9.1f}ms")
+    finally:
+        for row in rows:
+            Issue.update_status(row['id'], row['status'])
+
+
+if __name__ == '__main__':
+    main()
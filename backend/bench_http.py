@@ -0,0 +1,76 @@
+"""
+Measure bytes on the wire and server CPU for repeated dashboard polling.
+
+Runs the Flask app in-process against the configured Supabase project and polls
+the admin/analytics/leaderboard endpoints three ways: plain, compressed, and
+compressed + conditional (If-None-Match). Usage: python bench_http.py [rounds]
+"""
+import sys
+import time
+
+from flask_jwt_extended import create_access_token
+
+from app import app
+from models.user import User
+
+ENDPOINTS = [
+    '/api/admin/issues',
+    '/api/admin/dashboard',
+    '/api/analytics/categories',
+    '/api/analytics/urgency',
+    '/api/analytics/trends',
+    '/api/auth/leaderboard',
+]
+
+
+def poll(client, headers, rounds, conditional=False):
+    etags = {}
+    total_bytes = 0
+    not_modified = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(rounds):
+        for path in ENDPOINTS:
+            request_headers = dict(headers)
+            if conditional and path in etags:
+                request_headers['If-None-Match'] = etags[path]
+            response = client.get(path, headers=request_headers)
+            total_bytes += len(response.get_data())
+            if response.status_code == 304:
+                not_modified += 1
+            if response.headers.get('ETag'):
+                etags[path] = response.headers['ETag']
+    return {
+        'bytes': total_bytes,
+        'cpu_ms': (time.process_time() - cpu_start) * 1000,
+        'wall_ms': (time.perf_counter() - wall_start) * 1000,
+        'not_modified': not_modified,
+    }
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    admin = User.find_by_email('admin@campusfix.com')
+    if not admin:
+        print("Admin user not found; start app.py once to create it")
+        return
+
+    with app.app_context():
+        token = create_access_token(identity=admin['id'])
+    auth = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+
+    scenarios = [
+        ('identity', {**auth, 'Accept-Encoding': 'identity'}, False),
+        ('gzip', {**auth, 'Accept-Encoding': 'gzip'}, False),
+        ('gzip + etag', {**auth, 'Accept-Encoding': 'gzip'}, True),
+    ]
+    print(f"{rounds} polling rounds x {len(ENDPOINTS)} endpoints")
+    for name, headers, conditional in scenarios:
+        result = poll(client, headers, rounds, conditional)
+        print(f"{name:<14} bytes={result['bytes']:>10}  cpu={result['cpu_ms']:8.1f}ms  "
+              f"wall={result['wall_ms']:8.1f}ms  304s={result['not_modified']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Latency of the multi-query paths with serial calls (old behaviour) vs run_parallel.
+
+Talks to the configured Supabase project. Usage: python bench_queries.py [rounds]
+"""
+import statistics
+import sys
+import time
+
+from query_executor import run_parallel
+from models.issue import Issue
+from models.user import User
+
+
+def status_update_calls(admin_id, issue_id):
+    return {
+        'user': lambda: User.find_by_id(admin_id),
+        'issue': lambda: Issue.get_by_id(issue_id)
+    }
+
+
+def timed(func, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def report(name, make_calls, rounds):
+    serial = timed(lambda: {k: f() for k, f in make_calls().items()}, rounds)
+    parallel = timed(lambda: run_parallel(make_calls()), rounds)
+    print(f"{name:<22} serial p50={serial[0]:7.1f}ms p95={serial[1]:7.1f}ms   "
+          f"parallel p50={parallel[0]:7.1f}ms p95={parallel[1]:7.1f}ms")
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    report('dashboard analytics', Issue.analytics_queries, rounds)
+
+    admin = User.find_by_email('admin@campusfix.com')
+    issues = Issue.find_all()
+    if admin and issues:
+        report('status update lookups', lambda: status_update_calls(admin['id'], issues[0]['id']), rounds)
+
+
+if __name__ == '__main__':
+    main()
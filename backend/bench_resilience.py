@@ -0,0 +1,125 @@
+"""
+Tail latency and failure behaviour of Supabase reads through db_resilience.
+
+Starts a local fake PostgREST server that answers the users lookup with injected
+latency (a fraction of slow responses) and errors (503s), points the app's Supabase
+client at it, and compares User.find_by_id with retries/hedging off vs on. A last
+phase takes the fake backend down to show the circuit breaker failing fast and
+recovering. No Supabase project is needed.
+
+Usage: python bench_resilience.py [rounds] [slow_fraction] [slow_ms] [error_fraction]
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+USER = {'id': 'u1', 'email': 'bench@campusfix.com', 'name': 'Bench', 'role': 'student', 'points': 0, 'badges': []}
+
+
+class FakeBackend:
+    def __init__(self, slow_fraction, slow_ms, error_fraction):
+        self.slow_fraction = slow_fraction
+        self.slow_ms = slow_ms
+        self.error_fraction = error_fraction
+        self.down = False
+        self.requests = 0
+
+
+def make_handler(backend):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            backend.requests += 1
+            if backend.down or random.random() < backend.error_fraction:
+                self.send_response(503)
+                self.send_header('Content-Type', 'text/plain')
+                self.end_headers()
+                self.wfile.write(b'Service Unavailable')
+                return
+            if random.random() < backend.slow_fraction:
+                time.sleep(backend.slow_ms / 1000)
+            else:
+                time.sleep(0.002)
+            body = json.dumps([USER]).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda p: ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+    return pick(50), pick(99), ordered[-1]
+
+
+def run_phase(name, rounds, find_by_id, unavailable):
+    samples = []
+    errors = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        try:
+            if find_by_id('u1') is None:
+                errors += 1
+        except unavailable:
+            errors += 1
+        samples.append((time.perf_counter() - start) * 1000)
+    p50, p99, worst = percentiles(samples)
+    print(f"{name:<28} p50={p50:7.1f}ms p99={p99:7.1f}ms max={worst:7.1f}ms errors={errors}")
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    backend = FakeBackend(
+        slow_fraction=float(sys.argv[2]) if len(sys.argv) > 2 else 0.05,
+        slow_ms=float(sys.argv[3]) if len(sys.argv) > 3 else 300,
+        error_fraction=float(sys.argv[4]) if len(sys.argv) > 4 else 0.02,
+    )
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(backend))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Must be set before supabase_client is imported
+    os.environ['SUPABASE_URL'] = f'http://127.0.0.1:{server.server_port}'
+    os.environ['SUPABASE_KEY'] = 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.bench'
+
+    import db_resilience
+    from models.user import User
+
+    print(f"fake backend: {backend.slow_fraction:.0%} of reads take {backend.slow_ms:.0f}ms, "
+          f"{backend.error_fraction:.0%} answer 503")
+
+    hedge_delay, retries = db_resilience.HEDGE_DELAY, db_resilience.READ_RETRIES
+    db_resilience.HEDGE_DELAY, db_resilience.READ_RETRIES = 0, 0
+    run_phase('no retries, no hedging', rounds, User.find_by_id, db_resilience.DatabaseUnavailable)
+    db_resilience.READ_RETRIES = retries
+    run_phase('retries', rounds, User.find_by_id, db_resilience.DatabaseUnavailable)
+    db_resilience.HEDGE_DELAY = hedge_delay or 0.05
+    run_phase(f'retries + hedge@{db_resilience.HEDGE_DELAY * 1000:.0f}ms', rounds, User.find_by_id,
+              db_resilience.DatabaseUnavailable)
+
+    # Outage: the breaker should open after a few failures and then reject without a round trip
+    db_resilience.breaker = db_resilience.CircuitBreaker(db_resilience.BREAKER_FAILURES, reset_timeout=1)
+    backend.down = True
+    before = backend.requests
+    run_phase('backend down', 50, User.find_by_id, db_resilience.DatabaseUnavailable)
+    print(f"{'':<28} {backend.requests - before} of 50 calls reached the backend, "
+          f"breaker {db_resilience.breaker.state}")
+
+    backend.down = False
+    time.sleep(1.1)
+    run_phase('recovered', 50, User.find_by_id, db_resilience.DatabaseUnavailable)
+    print(f"{'':<28} breaker {db_resilience.breaker.state}, stats {db_resilience.stats()}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
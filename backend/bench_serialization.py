@@ -0,0 +1,117 @@
+"""
+Serialization microbenchmark: hand-built dicts + stdlib json (old admin path) vs
+RowFormatter + the app's JSON provider. Runs offline on synthetic rows.
+Usage: python bench_serialization.py [rows]
+"""
+import json
+import random
+import sys
+import time
+
+from flask import Flask
+
+from serialization import init_json, RowFormatter, Field, parse_location
+
+CATEGORIES = ['sanitation', 'infrastructure', 'electrical', 'security', 'general']
+STATUSES = ['pending', 'in_progress', 'resolved']
+
+
+def make_rows(n):
+    rng = random.Random(42)
+    return [{
+        'id': f'00000000-0000-0000-0000-{i:012d}',
+        'user_id': f'11111111-0000-0000-0000-{i % 500:012d}',
+        'description': 'Water leaking from the ceiling near the second floor washroom ' * 2,
+        'category': rng.choice(CATEGORIES),
+        'urgency': rng.choice(['low', 'medium', 'high']),
+        'status': rng.choice(STATUSES),
+        # One location per report, as in real data: nothing to reuse between rows
+        'location': str({'lat': rng.uniform(-90, 90), 'lng': rng.uniform(-180, 180), 'name': f'Block {i}'}),
+        'image_data': None,
+        'is_duplicate': rng.random() < 0.1,
+        'created_at': '2026-01-01T10:00:00.000000+00:00',
+        'updated_at': '2026-01-02T10:00:00.000000+00:00',
+        'user': {'name': f'Student {i % 500}', 'email': f'student{i % 500}@campus.edu'}
+    } for i in range(n)]
+
+
+def old_format(issues):
+    formatted_issues = []
+    for issue in issues:
+        user_data = issue.get('user') or {}
+        loc = issue.get('location', {})
+        if isinstance(loc, str):
+            try:
+                loc = loc.replace("'", '"')
+                loc = json.loads(loc)
+            except:
+                loc = {}
+        formatted_issues.append({
+            'id': issue['id'],
+            'description': issue['description'],
+            'category': issue['category'],
+            'urgency': issue['urgency'],
+            'status': issue['status'],
+            'location': loc,
+            'image_data': issue.get('image_data'),
+            'is_duplicate': issue.get('is_duplicate', False),
+            'created_at': issue['created_at'],
+            'user': {
+                'name': user_data.get('name', 'Unknown'),
+                'email': user_data.get('email', 'Unknown')
+            }
+        })
+    return formatted_issues
+
+
+def _issue_user(issue):
+    user_data = issue.get('user') or {}
+    return {'name': user_data.get('name', 'Unknown'), 'email': user_data.get('email', 'Unknown')}
+
+
+ROW = RowFormatter(
+    id='id',
+    description='description',
+    category='category',
+    urgency='urgency',
+    status='status',
+    location=Field('location', transform=parse_location),
+    image_data=Field('image_data'),
+    is_duplicate=Field('is_duplicate', default=False),
+    created_at='created_at',
+    user=_issue_user
+)
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rows = make_rows(n)
+
+    stdlib_app = Flask('stdlib')
+    fast_app = Flask('fast')
+    init_json(fast_app)
+
+    def run(app, formatter):
+        with app.app_context():
+            return app.json.response({'issues': formatter(rows)}).get_data()
+
+    assert json.loads(run(stdlib_app, old_format)) == json.loads(run(fast_app, ROW.format_all))
+
+    print(f"{n} rows, best of 5")
+    print(f"{'format only (old)':<28} {best_of(lambda: old_format(rows)):8.1f}ms")
+    print(f"{'format only (RowFormatter)':<28} {best_of(lambda: ROW.format_all(rows)):8.1f}ms")
+    print(f"{'old + stdlib json':<28} {best_of(lambda: run(stdlib_app, old_format)):8.1f}ms")
+    print(f"{'RowFormatter + provider':<28} {best_of(lambda: run(fast_app, ROW.format_all)):8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+import contextvars
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import httpx
+from flask import jsonify
+
+from app_logging import get_logger
+from supabase_client import POOL_MAX_CONNECTIONS
+
+logger = get_logger('db')
+
+# Whole-call budgets in seconds for reads, retries included. Scans and aggregates (slow=True)
+# use the slow one. Writes have none: they run until the httpx timeouts end them.
+READ_DEADLINE = float(os.getenv('DB_READ_DEADLINE', 4))
+SLOW_DEADLINE = float(os.getenv('DB_SLOW_DEADLINE', 15))
+READ_RETRIES = int(os.getenv('DB_READ_RETRIES', 2))
+RETRY_BASE_DELAY = float(os.getenv('DB_RETRY_BASE_DELAY', 0.05))
+RETRY_MAX_DELAY = float(os.getenv('DB_RETRY_MAX_DELAY', 0.5))
+# A hedged read sends a second copy if the first has not answered after this long; 0 disables
+HEDGE_DELAY = float(os.getenv('DB_HEDGE_DELAY', 0.1))
+BREAKER_FAILURES = int(os.getenv('DB_BREAKER_FAILURES', 5))
+BREAKER_RESET = float(os.getenv('DB_BREAKER_RESET', 10))
+
+# Attempts run here so the caller can stop waiting at its deadline. Abandoned attempts
+# keep a worker until the httpx timeouts in supabase_client end them.
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('DB_CALL_WORKERS', POOL_MAX_CONNECTIONS * 2)),
+    thread_name_prefix='supabase-call'
+)
+
+
+class DatabaseUnavailable(Exception):
+    """Supabase is down, too slow or shed by the breaker; answered with 503, never masked as empty data."""
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _AttemptTimeout(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive transient failures and rejects calls
+    for reset_timeout seconds. Then one probe call is let through: success closes
+    the breaker, failure opens it again.
+
+    Outcomes are recorded by the attempt itself when the database answers (or the
+    httpx timeouts give up), not when a caller stops waiting: a heavy but healthy
+    scan that outlives its deadline is not a sign of an unhealthy backend.
+    """
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if self._probing or time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+
+    def retry_after(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 0
+            return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self, started_at=None):
+        with self._lock:
+            if self._opened_at is not None and started_at is not None and started_at < self._opened_at:
+                # A late answer to a request sent before the breaker opened says nothing about now
+                return
+            if self._opened_at is not None:
+                logger.info("Database circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release(self):
+        """An allowed call that never reached the database: let the next probe through"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning("Database circuit opened", extra={'failures': self._failures})
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET)
+
+_stats_lock = threading.Lock()
+_stats = {'calls': 0, 'retries': 0, 'hedges': 0, 'timeouts': 0, 'rejected': 0, 'failures': 0}
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def stats():
+    with _stats_lock:
+        return dict(_stats, breaker=breaker.state)
+
+
+def _is_transient(error):
+    if isinstance(error, httpx.TransportError):
+        return True
+    # postgrest APIError: HTTP 5xx from the gateway, PostgREST's own connection errors
+    # (PGRST000-002 could not connect or load the schema cache, PGRST003 pool timeout),
+    # or a Postgres class that means "try again" (08 connection, 53 resources,
+    # 57P shutdown, serialization/deadlock)
+    code = str(getattr(error, 'code', '') or '')
+    return (len(code) == 3 and code.startswith('5')) \
+        or code in ('PGRST000', 'PGRST001', 'PGRST002', 'PGRST003') \
+        or code.startswith(('08', '53', '57P')) \
+        or code in ('40001', '40P01')
+
+
+def _run(query, give_up_at):
+    # Attempts that sat in the queue past their deadline never reach the database
+    if time.monotonic() >= give_up_at:
+        breaker.release()
+        raise _AttemptTimeout()
+    started_at = time.monotonic()
+    try:
+        result = query.execute()
+    except Exception as e:
+        if _is_transient(e):
+            breaker.record_failure()
+        else:
+            # The database answered; the request itself was bad
+            breaker.record_success(started_at)
+        raise
+    breaker.record_success(started_at)
+    return result
+
+
+def _attempt(query, timeout, hedge):
+    """One attempt, optionally hedged: the first copy to answer wins. timeout=None waits it out."""
+    give_up_at = time.monotonic() + timeout if timeout is not None else math.inf
+    futures = [_executor.submit(contextvars.copy_context().run, _run, query, give_up_at)]
+    hedge_at = time.monotonic() + HEDGE_DELAY if hedge and HEDGE_DELAY > 0 else None
+    error = None
+    while futures:
+        now = time.monotonic()
+        if now >= give_up_at:
+            break
+        wake_at = min(give_up_at, hedge_at) if hedge_at else give_up_at
+        done, pending = wait(futures, timeout=wake_at - now if wake_at != math.inf else None,
+                             return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                return future.result()
+            except Exception as e:
+                error = e
+        futures = list(pending)
+        if hedge_at and time.monotonic() >= hedge_at:
+            hedge_at = None
+            _count('hedges')
+            futures.append(_executor.submit(contextvars.copy_context().run, _run, query, give_up_at))
+    if futures or error is None:
+        _count('timeouts')
+        raise _AttemptTimeout()
+    raise error
+
+
+def _call(query, deadline, retries, hedge):
+    _count('calls')
+    if hasattr(query, 'retry'):
+        # Newer postgrest retries 503s itself with multi-second sleeps; the deadline owns retries here
+        query = query.retry(False)
+    deadline_at = time.monotonic() + deadline if deadline is not None else math.inf
+    attempts = retries + 1
+    for attempt in range(attempts):
+        if not breaker.allow():
+            _count('rejected')
+            raise DatabaseUnavailable('Database circuit open', retry_after=breaker.retry_after())
+        try:
+            # Each attempt may use all that is left of the deadline. A timed-out attempt is
+            # still running, so it is never retried: a copy would only add load to a slow backend.
+            return _attempt(query, deadline_at - time.monotonic() if deadline is not None else None, hedge)
+        except _AttemptTimeout:
+            raise DatabaseUnavailable('Database call timed out')
+        except Exception as e:
+            if not _is_transient(e):
+                raise
+            _count('failures')
+            error = e
+
+        # Full jitter keeps retries from many threads from arriving in lockstep
+        backoff = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+        if attempt + 1 == attempts or time.monotonic() + backoff >= deadline_at:
+            break
+        _count('retries')
+        time.sleep(backoff)
+
+    raise DatabaseUnavailable(f'Database call failed: {error}') from error
+
+
+def execute_read(query, deadline=None, hedge=False, slow=False):
+    """
+    Execute an idempotent postgrest request (a builder, not yet executed) within
+    deadline seconds, retrying fast transient failures with jittered backoff; a call
+    that runs out of time is not retried. hedge=True sends a second copy after
+    HEDGE_DELAY if the first is slow; use it for small, latency-critical lookups only.
+    slow=True gives full-table scans and aggregates SLOW_DEADLINE.
+    """
+    return _call(query, deadline or (SLOW_DEADLINE if slow else READ_DEADLINE), READ_RETRIES, hedge)
+
+
+def execute_write(query):
+    """
+    Like execute_read but never retried and never abandoned: a write the caller stopped
+    waiting for could still commit, and the client's retry would then apply it twice
+    (a second issue for an insert). It runs until it answers or the httpx timeouts end it.
+    """
+    return _call(query, None, 0, False)
+
+
+def init_resilience(app):
+    @app.errorhandler(DatabaseUnavailable)
+    def database_unavailable(e):
+        response = jsonify({'error': 'Database temporarily unavailable, try again shortly'})
+        response.headers['Retry-After'] = str(max(1, round(e.retry_after)))
+        return response, 503
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+from collections import deque
+
+HISTORY_SIZE = int(os.getenv('EVENTS_HISTORY_SIZE', 1000))
+SUBSCRIBER_BUFFER_SIZE = int(os.getenv('EVENTS_SUBSCRIBER_BUFFER', 100))
+MAX_SUBSCRIBERS = int(os.getenv('EVENTS_MAX_SUBSCRIBERS', 50))
+HEARTBEAT_SECONDS = float(os.getenv('EVENTS_HEARTBEAT_SECONDS', 15))
+RECONNECT_MS = int(os.getenv('EVENTS_RECONNECT_MS', 3000))
+
+
+class Subscription:
+    """
+    One connected client. Holds at most buffer_size undelivered events; if the
+    client falls further behind, the oldest are dropped and it is told to resync.
+    """
+    def __init__(self, buffer_size):
+        self._events = deque(maxlen=buffer_size)
+        self._cond = threading.Condition()
+        self.lagged = False
+
+    def push(self, event):
+        with self._cond:
+            if len(self._events) == self._events.maxlen:
+                self.lagged = True
+            self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout):
+        """Next event, or None if nothing arrived within timeout (time to heartbeat)."""
+        with self._cond:
+            if not self._events:
+                self._cond.wait(timeout)
+            if not self._events:
+                return None
+            return self._events.popleft()
+
+
+class EventBroker:
+    """
+    In-process pub/sub for dashboard events. Event ids are monotonic per process;
+    recent events are kept so a reconnecting client can resume from Last-Event-ID.
+    """
+    def __init__(self, history_size=HISTORY_SIZE, buffer_size=SUBSCRIBER_BUFFER_SIZE, max_subscribers=MAX_SUBSCRIBERS):
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._next_id = 1
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+
+    def publish(self, event_type, data):
+        with self._lock:
+            event = {'id': self._next_id, 'type': event_type, 'data': data}
+            self._next_id += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub.push(event)
+        return event
+
+    def subscribe(self, last_event_id=None):
+        """
+        Register a subscriber. Returns (subscription, backlog, complete) where backlog
+        holds the events missed since last_event_id and complete is False if some of
+        them already fell out of history. Registration and the history snapshot happen
+        under one lock, so no event is both in the backlog and queued. Returns None
+        when at capacity.
+        """
+        sub = Subscription(self.buffer_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(sub)
+            backlog = []
+            complete = True
+            if last_event_id is not None:
+                backlog = [e for e in self._history if e['id'] > last_event_id]
+                oldest = self._history[0]['id'] if self._history else self._next_id
+                # An id from the future means this process restarted and history is gone
+                complete = oldest - 1 <= last_event_id < self._next_id
+        return sub, backlog, complete
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+broker = EventBroker()
+
+# Keys match the /api/admin/dashboard response so clients can apply deltas directly
+STATUS_COUNTERS = {
+    'pending': 'pending_issues',
+    'in_progress': 'in_progress_issues',
+    'resolved': 'resolved_issues'
+}
+
+
+def publish_issue_created(issue):
+    delta = {'total_issues': 1}
+    status_key = STATUS_COUNTERS.get(issue.get('status'))
+    if status_key:
+        delta[status_key] = 1
+    if issue.get('urgency') == 'high':
+        delta['high_priority_issues'] = 1
+    summary = {k: issue.get(k) for k in ('id', 'description', 'category', 'urgency', 'status', 'is_duplicate', 'created_at')}
+    return broker.publish('issue_created', {'issue': summary, 'delta': delta})
+
+
+def publish_status_changed(issue_id, status, previous_status=None):
+    data = {'issue_id': issue_id, 'status': status, 'previous_status': previous_status}
+    if previous_status is not None:
+        delta = {}
+        if previous_status != status:
+            if previous_status in STATUS_COUNTERS:
+                delta[STATUS_COUNTERS[previous_status]] = -1
+            if status in STATUS_COUNTERS:
+                delta[STATUS_COUNTERS[status]] = 1
+        data['delta'] = delta
+    # Without previous_status the delta is unknown; clients refetch the dashboard
+    return broker.publish('status_changed', data)
+
+
+def format_sse(event=None, event_type=None, data=None):
+    if event is not None:
+        return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream(sub, backlog, complete):
+    """Generator of SSE frames for one subscriber; unsubscribes when the client goes away."""
+    try:
+        yield f"retry: {RECONNECT_MS}\n\n"
+        if not complete:
+            yield format_sse(event_type='resync', data={'reason': 'history_expired'})
+        for event in backlog:
+            yield format_sse(event)
+        while True:
+            event = sub.get(HEARTBEAT_SECONDS)
+            if sub.lagged:
+                sub.lagged = False
+                yield format_sse(event_type='resync', data={'reason': 'buffer_overflow'})
+            if event is None:
+                yield ": heartbeat\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(sub)
@@ -0,0 +1,124 @@
+import gzip
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this are sent as-is; compressing them costs more than it saves
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+COMPRESS_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+
+
+def _choose_encoding(accept_encoding):
+    if brotli is not None and 'br' in accept_encoding:
+        return 'br'
+    if 'gzip' in accept_encoding:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """
+    after_request hook: gzip/brotli encode large textual responses
+    """
+    if response.status_code < 200 or response.status_code >= 300 or response.status_code == 204:
+        return response
+    if response.direct_passthrough or response.is_streamed:
+        return response
+    if 'Content-Encoding' in response.headers:
+        return response
+    if response.mimetype not in COMPRESS_MIMETYPES:
+        return response
+
+    encoding = _choose_encoding(request.accept_encodings)
+    response.vary.add('Accept-Encoding')
+    if not encoding:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=min(COMPRESS_LEVEL, 11))
+    else:
+        compressed = gzip.compress(data, compresslevel=COMPRESS_LEVEL)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.headers['Content-Length'] = str(len(compressed))
+    # A compressed body is a different representation of the same resource
+    if response.headers.get('ETag') and not response.headers['ETag'].startswith('W/'):
+        response.headers['ETag'] = 'W/' + response.headers['ETag']
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
+
+
+def _parse_timestamp(value):
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.replace(microsecond=0)
+
+
+def conditional(version_func):
+    """
+    Decorator for GET views whose output only changes when version_func() changes.
+
+    version_func returns an opaque version marker (e.g. the latest issues.updated_at).
+    If the client's If-None-Match / If-Modified-Since is still current, a 304 is
+    returned before the view runs, so the payload is neither recomputed nor serialized.
+    Access checks must be decorators above this one, not inside the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = version_func()
+            if version is None:
+                return view(*args, **kwargs)
+
+            key = f"{request.endpoint}:{request.query_string.decode()}:{version}"
+            etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+            last_modified = _parse_timestamp(version)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            elif last_modified and request.if_modified_since:
+                not_modified = last_modified <= request.if_modified_since
+            else:
+                not_modified = False
+
+            if not_modified:
+                response = current_app.response_class(status=304)
+                response.set_etag(etag, weak=True)
+                if last_modified:
+                    response.last_modified = last_modified
+                response.cache_control.no_cache = True
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag, weak=True)
+                if last_modified:
+                    response.last_modified = last_modified
+                # Clients may keep the copy but must revalidate before using it
+                response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
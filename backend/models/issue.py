@@ -1,10 +1,38 @@
 from supabase_client import supabase
+from query_executor import run_parallel
+from app_logging import get_logger
+from db_resilience import execute_read, execute_write, DatabaseUnavailable, SLOW_DEADLINE
+from events import publish_issue_created, publish_status_changed
+from search_index import local_index, SEARCH_COLUMNS
 from datetime import datetime
+import os
+import uuid
+
+logger = get_logger('models.issue')
+
+# 'postgres' uses the search_issues() function from supabase_schema.sql;
+# 'memory' keeps a local inverted index, for development without the migration
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'postgres')
+
+# What get_by_id callers (status changes, resolve) need
+ISSUE_LOOKUP_COLUMNS = 'id, user_id, status, cluster_id, canonical_id'
+
+# Everything the admin issue list shows. Never '*': that would also ship search_vector,
+# and the joined user row would carry the password hash
+ADMIN_ISSUE_COLUMNS = 'id, description, image_data, location, category, urgency, status, is_duplicate, ' \
+    'cluster_id, canonical_id, created_at, user:users(name, email)'
+
+# Everything My Reports shows; image_data is deliberately left out
+MY_REPORT_COLUMNS = 'id, description, category, urgency, status, location, is_duplicate, created_at, updated_at'
 
 class Issue:
     @staticmethod
-    def create_issue(user_id, description, image_data, location, category, urgency, is_duplicate=False):
+    def create_issue(user_id, description, image_data, location, category, urgency, is_duplicate=False,
+                     cluster_id=None, canonical_id=None):
+        # Generate the id here so a new issue can be the root of its own cluster in one insert
+        issue_id = str(uuid.uuid4())
         issue = {
+            'id': issue_id,
             'user_id': user_id,
             'description': description,
             'image_data': image_data,
@@ -13,130 +41,420 @@ class Issue:
             'urgency': urgency,
             'status': 'pending',
             'is_duplicate': is_duplicate,
+            'cluster_id': cluster_id or issue_id,
+            'canonical_id': canonical_id or issue_id,
             'created_at': datetime.utcnow().isoformat(),
             'updated_at': datetime.utcnow().isoformat()
         }
         try:
-            response = supabase.table('issues').insert(issue).execute()
+            response = execute_write(supabase.table('issues').insert(issue))
             if response.data:
+                publish_issue_created(response.data[0])
+                if local_index.loaded:
+                    local_index.add(response.data[0])
                 return response.data[0]['id']
             return None
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error creating issue: {e}")
+            logger.exception("Error creating issue")
             return None
     
     @staticmethod
     def find_by_user(user_id):
         try:
-            response = supabase.table('issues').select('*').eq('user_id', user_id).order('created_at', desc=True).execute()
+            response = execute_read(supabase.table('issues').select(MY_REPORT_COLUMNS).eq('user_id', user_id).order('created_at', desc=True))
             return response.data
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error finding issues by user: {e}")
+            logger.exception("Error finding issues by user")
             return []
     
+    @staticmethod
+    def find_changed_by_user(user_id, updated_at, issue_id):
+        """
+        The user's issues created or changed after the (updated_at, id) cursor,
+        oldest change first. Uses the (user_id, updated_at, id) index.
+        """
+        try:
+            response = execute_read(supabase.table('issues').select(MY_REPORT_COLUMNS)\
+                .eq('user_id', user_id)\
+                .or_(f'updated_at.gt."{updated_at}",and(updated_at.eq."{updated_at}",id.gt.{issue_id})')\
+                .order('updated_at')\
+                .order('id'))
+            return response.data
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            logger.exception("Error finding changed issues by user")
+            return None
+    
+    @staticmethod
+    def find_tombstones(user_id, since=None, latest_only=False):
+        # Rows left behind by the delete trigger on issues (see supabase_schema.sql)
+        try:
+            query = supabase.table('issue_tombstones').select('issue_id, deleted_at').eq('user_id', user_id)
+            if since:
+                query = query.gt('deleted_at', since)
+            if latest_only:
+                return execute_read(query.order('deleted_at', desc=True).limit(1)).data
+            return execute_read(query.order('deleted_at')).data
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            logger.exception("Error finding tombstones")
+            return None
+    
     @staticmethod
     def find_all():
         try:
             # Join with users table
-            response = supabase.table('issues').select('*, user:users(*)').order('created_at', desc=True).execute()
+            response = execute_read(supabase.table('issues').select(ADMIN_ISSUE_COLUMNS).order('created_at', desc=True), slow=True)
             return response.data
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error finding all issues: {e}")
+            logger.exception("Error finding all issues")
             return []
     
     @staticmethod
-    def update_status(issue_id, status):
+    def update_status(issue_id, status, previous_status=None):
+        # previous_status lets live dashboards apply a counter delta instead of refetching
         try:
-            response = supabase.table('issues').update({
+            response = execute_write(supabase.table('issues').update({
                 'status': status,
                 'updated_at': datetime.utcnow().isoformat()
-            }).eq('id', issue_id).execute()
+            }).eq('id', issue_id))
+            if response.data:
+                publish_status_changed(issue_id, status, previous_status)
+                local_index.set_status(issue_id, status)
             return len(response.data) > 0
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error updating status: {e}")
+            logger.exception("Error updating status")
             return False
     
+    @staticmethod
+    def update_status_bulk(issue_ids, status):
+        """
+        Set status on many issues in one round trip (update_issue_status_bulk() in
+        supabase_schema.sql). Issues already in the target status are left untouched;
+        resolving a canonical issue resolves the rest of its duplicate cluster too.
+        Returns (previous, updated_ids) where previous maps every existing id,
+        cascaded duplicates included, to {'status', 'user_id'} as it was before.
+        """
+        try:
+            response = execute_write(supabase.rpc('update_issue_status_bulk', {
+                'issue_ids': issue_ids,
+                'new_status': status
+            }))
+            previous = {row['id']: {'status': row['previous_status'], 'user_id': row['user_id']}
+                        for row in response.data}
+            updated_ids = [row['id'] for row in response.data if row['updated']]
+            
+            for issue_id in updated_ids:
+                publish_status_changed(issue_id, status, previous[issue_id]['status'])
+                local_index.set_status(issue_id, status)
+            return previous, updated_ids
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            logger.exception("Error updating status in bulk")
+            return None, []
+    
     @staticmethod
     def get_by_id(issue_id):
         try:
-            response = supabase.table('issues').select('*').eq('id', issue_id).execute()
+            # Hedged: on every admin status change and resolve. Small columns only, so a
+            # hedge never downloads image_data twice
+            response = execute_read(supabase.table('issues').select(ISSUE_LOOKUP_COLUMNS).eq('id', issue_id), hedge=True)
             if response.data:
                 return response.data[0]
             return None
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            logger.exception("Error getting issue by id")
+            return None
+    
+    @staticmethod
+    def search(query, status=None, category=None, urgency=None, after=None, limit=20):
+        """
+        Ranked full-text search over descriptions. after is the (rank, id) of the
+        last row of the previous page. Returns rows with a 'rank' field.
+        """
+        try:
+            if SEARCH_BACKEND == 'memory':
+                if not local_index.loaded:
+                    response = execute_read(supabase.table('issues').select(SEARCH_COLUMNS), slow=True)
+                    local_index.load(response.data)
+                filters = {'status': status, 'category': category, 'urgency': urgency}
+                return local_index.search(query, filters, after, limit)
+            
+            response = execute_read(supabase.rpc('search_issues', {
+                'q': query,
+                'p_status': status,
+                'p_category': category,
+                'p_urgency': urgency,
+                'after_rank': after[0] if after else None,
+                'after_id': after[1] if after else None,
+                'page_size': limit
+            }), slow=True)
+            return response.data
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error getting issue by id: {e}")
+            logger.exception("Error searching issues")
+            return []
+    
+    @staticmethod
+    def get_last_modified():
+        # Cheap version marker for conditional GETs: newest updated_at across all issues,
+        # or the newest archival or deletion, which remove rows without touching any updated_at
+        try:
+            results = run_parallel({
+                'updated': lambda: execute_read(supabase.table('issues').select('updated_at')\
+                    .order('updated_at', desc=True).limit(1)).data,
+                'archived': lambda: execute_read(supabase.table('issues_archive').select('archived_at')\
+                    .order('archived_at', desc=True).limit(1)).data,
+                'deleted': lambda: execute_read(supabase.table('issue_tombstones').select('deleted_at')\
+                    .order('deleted_at', desc=True).limit(1)).data
+            })
+            markers = [row['updated_at'] for row in results['updated']] + \
+                [row['archived_at'] for row in results['archived']] + \
+                [row['deleted_at'] for row in results['deleted']]
+            # All are timestamptz rendered the same way by PostgREST, so they compare as strings
+            return max(markers) if markers else None
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            logger.exception("Error getting last modified")
             return None
     
     @staticmethod
     def get_all_descriptions():
         try:
-            response = supabase.table('issues').select('description').execute()
+            response = execute_read(supabase.table('issues').select('description'), slow=True)
             return [issue['description'] for issue in response.data]
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            logger.exception("Error getting descriptions")
+            return []
+    
+    @staticmethod
+    def get_duplicate_candidates():
+        try:
+            response = execute_read(supabase.table('issues').select('id, description, cluster_id, canonical_id, created_at'), slow=True)
+            return response.data
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            logger.exception("Error getting duplicate candidates")
+            return []
+    
+    @staticmethod
+    def join_clusters(matches):
+        """
+        Union the clusters of the matched issues (rows from get_duplicate_candidates)
+        and return (cluster_id, canonical_id) for a new duplicate to join. The cluster
+        whose root issue is oldest wins; the others are relabelled in one write.
+        """
+        roots = {}
+        for row in matches:
+            root = row.get('cluster_id') or row['id']
+            roots.setdefault(root, row.get('canonical_id') or root)
+        
+        created = {row['id']: row['created_at'] for row in matches}
+        if len(roots) > 1:
+            # Roots need not be among the matches themselves; look up their age
+            missing = [r for r in roots if r not in created]
+            if missing:
+                try:
+                    response = execute_read(supabase.table('issues').select('id, created_at').in_('id', missing))
+                    created.update({row['id']: row['created_at'] for row in response.data})
+                except DatabaseUnavailable:
+                    raise
+                except Exception as e:
+                    logger.exception("Error looking up cluster roots")
+        
+        # A root whose age could not be found (lookup failed, or it is no longer in issues)
+        # must never win: live clusters would be relabelled under a row that is gone
+        winner = min(roots, key=lambda r: (r not in created, created.get(r) or ''))
+        canonical = roots[winner]
+        losers = [r for r in roots if r != winner]
+        if losers:
+            try:
+                execute_write(supabase.table('issues').update({
+                    'cluster_id': winner,
+                    'canonical_id': canonical,
+                    'is_duplicate': True,
+                    'updated_at': datetime.utcnow().isoformat()
+                }).in_('cluster_id', losers))
+            except DatabaseUnavailable:
+                raise
+            except Exception as e:
+                logger.exception("Error merging clusters")
+        return winner, canonical
+    
+    @staticmethod
+    def get_clusters(limit=100):
+        # issue_clusters is a view over issues grouped by cluster_id (see supabase_schema.sql)
+        try:
+            response = execute_read(supabase.table('issue_clusters').select('*')\
+                .order('open_count', desc=True)\
+                .order('member_count', desc=True)\
+                .limit(limit), slow=True)
+            return response.data
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error getting descriptions: {e}")
+            logger.exception("Error getting clusters")
             return []
     
+    @staticmethod
+    def analytics_queries():
+        # Independent count queries behind the dashboard, as a parallel query group
+        def count(column=None, value=None):
+            query = supabase.table('issues').select('*', count='exact', head=True)
+            if column:
+                query = query.eq(column, value)
+            return lambda: execute_read(query, slow=True).count
+
+        return {
+            'total': count(),
+            'pending': count('status', 'pending'),
+            'in_progress': count('status', 'in_progress'),
+            'resolved': count('status', 'resolved'),
+            'high_priority': count('urgency', 'high')
+        }
+    
     @staticmethod
     def get_analytics():
-        # This is more complex in Supabase/Postgres if we want single query
-        # For simplicity, we can fetch all and aggregate in python or make multiple queries
-        # Or better, use RPC/Views in Supabase. For now, multiple queries is safer for migration speed.
-        try:
-            total = supabase.table('issues').select('*', count='exact', head=True).execute().count
-            pending = supabase.table('issues').select('*', count='exact', head=True).eq('status', 'pending').execute().count
-            in_progress = supabase.table('issues').select('*', count='exact', head=True).eq('status', 'in_progress').execute().count
-            resolved = supabase.table('issues').select('*', count='exact', head=True).eq('status', 'resolved').execute().count
-            high_priority = supabase.table('issues').select('*', count='exact', head=True).eq('urgency', 'high').execute().count
+        # Fan the counts out instead of paying five round trips in a row.
+        # In production, a single RPC/View would be better still.
+        try:
+            queries = Issue.analytics_queries()
+            queries['rollups'] = Issue.get_rollups
+            stats = run_parallel(queries)
             
-            return {
-                'total': total,
-                'pending': pending,
-                'in_progress': in_progress,
-                'resolved': resolved,
-                'high_priority': high_priority
-            }
-        except Exception as e:
-            print(f"Error getting analytics: {e}")
+            # Archived issues are all resolved and only survive as rollup counts
+            for rollup in stats.pop('rollups'):
+                stats['total'] += rollup['issue_count']
+                if rollup['status'] in stats:
+                    stats[rollup['status']] += rollup['issue_count']
+                if rollup['urgency'] == 'high':
+                    stats['high_priority'] += rollup['issue_count']
+            return stats
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            logger.exception("Error getting analytics")
             return {}
     
+    @staticmethod
+    def get_rollups():
+        # Daily counts of archived issues; small (days x categories x urgencies)
+        try:
+            response = execute_read(supabase.table('issue_rollups').select('day, category, urgency, status, issue_count'))
+            return response.data
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            logger.exception("Error getting rollups")
+            return []
+    
+    @staticmethod
+    def find_archived_by_user(user_id):
+        try:
+            response = execute_read(supabase.table('issues_archive').select(MY_REPORT_COLUMNS).eq('user_id', user_id).order('created_at', desc=True))
+            return response.data
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            logger.exception("Error finding archived issues by user")
+            return []
+    
+    @staticmethod
+    def archive_resolved(older_than_days, batch_size=5000):
+        """
+        Move one batch of resolved issues older than older_than_days to issues_archive,
+        folding them into issue_rollups. Returns how many were moved, or None on error.
+        """
+        try:
+            response = execute_write(supabase.rpc('archive_resolved_issues', {
+                'older_than_days': older_than_days,
+                'batch_size': batch_size
+            }), deadline=SLOW_DEADLINE)
+            return response.data
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            logger.exception("Error archiving issues")
+            return None
+    
     @staticmethod
     def get_category_stats():
         try:
             # Using a simplified approach: fetch all categories and count in python
             # In production, use a SQL view or RPC
-            response = supabase.table('issues').select('category').execute()
+            results = run_parallel({
+                'hot': lambda: execute_read(supabase.table('issues').select('category'), slow=True).data,
+                'rollups': Issue.get_rollups
+            })
             counts = {}
-            for item in response.data:
+            for item in results['hot']:
                 cat = item['category']
                 counts[cat] = counts.get(cat, 0) + 1
+            for rollup in results['rollups']:
+                cat = rollup['category']
+                counts[cat] = counts.get(cat, 0) + rollup['issue_count']
             return [{'_id': k, 'count': v} for k, v in counts.items()]
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error getting category stats: {e}")
+            logger.exception("Error getting category stats")
             return []
     
     @staticmethod
     def get_urgency_stats():
         try:
-            response = supabase.table('issues').select('urgency').execute()
+            results = run_parallel({
+                'hot': lambda: execute_read(supabase.table('issues').select('urgency'), slow=True).data,
+                'rollups': Issue.get_rollups
+            })
             counts = {}
-            for item in response.data:
+            for item in results['hot']:
                 urg = item['urgency']
                 counts[urg] = counts.get(urg, 0) + 1
+            for rollup in results['rollups']:
+                urg = rollup['urgency']
+                counts[urg] = counts.get(urg, 0) + rollup['issue_count']
             return [{'_id': k, 'count': v} for k, v in counts.items()]
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error getting urgency stats: {e}")
+            logger.exception("Error getting urgency stats")
             return []
     
     @staticmethod
     def get_trend_data():
         try:
-            # Fetch created_at dates
-            response = supabase.table('issues').select('created_at').execute()
+            # Fetch created_at dates of live issues; archived days come from rollups
+            results = run_parallel({
+                'hot': lambda: execute_read(supabase.table('issues').select('created_at'), slow=True).data,
+                'rollups': Issue.get_rollups
+            })
             dates = {}
-            for item in response.data:
+            for item in results['hot']:
                 # Extract date part YYYY-MM-DD
                 dt = item['created_at'][:10]
                 dates[dt] = dates.get(dt, 0) + 1
+            for rollup in results['rollups']:
+                dt = rollup['day'][:10]
+                dates[dt] = dates.get(dt, 0) + rollup['issue_count']
             
             # Format to match previous output structure
             result = []
@@ -147,6 +465,8 @@ class Issue:
                     'count': count
                 })
             return result
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error getting trend data: {e}")
+            logger.exception("Error getting trend data")
             return []
\ No newline at end of file
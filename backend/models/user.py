@@ -1,7 +1,12 @@
 from supabase_client import supabase
+from query_executor import run_parallel
+from app_logging import get_logger
+from db_resilience import execute_read, execute_write, DatabaseUnavailable
 from datetime import datetime
 import bcrypt
 
+logger = get_logger('models.user')
+
 class User:
     @staticmethod
     def create_user(email, password, name, role='student'):
@@ -16,83 +21,129 @@ class User:
             'created_at': datetime.utcnow().isoformat()
         }
         try:
-            response = supabase.table('users').insert(user).execute()
+            response = execute_write(supabase.table('users').insert(user))
             if response.data:
                 return response.data[0]['id']
             return None
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error creating user: {e}")
+            logger.exception("Error creating user")
             return None
     
     @staticmethod
     def find_by_email(email):
         try:
-            response = supabase.table('users').select('*').eq('email', email).execute()
+            response = execute_read(supabase.table('users').select('*').eq('email', email))
             if response.data:
                 return response.data[0]
             return None
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error finding user by email: {e}")
+            logger.exception("Error finding user by email")
             return None
     
     @staticmethod
     def find_by_id(user_id):
         try:
-            response = supabase.table('users').select('*').eq('id', user_id).execute()
+            # Hedged: every authenticated route starts with this lookup
+            response = execute_read(supabase.table('users').select('*').eq('id', user_id), hedge=True)
             if response.data:
                 return response.data[0]
             return None
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error finding user by id: {e}")
+            logger.exception("Error finding user by id")
             return None
     
     @staticmethod
     def verify_password(stored_password, provided_password):
         return bcrypt.checkpw(provided_password.encode('utf-8'), stored_password.encode('utf-8'))
     
+    @staticmethod
+    def apply_points(user, points_to_add):
+        """Return (new_points, badges) for user after adding points_to_add"""
+        new_points = user.get('points', 0) + points_to_add
+        badges = list(user.get('badges') or [])
+        
+        # Award badges based on points
+        if new_points >= 50 and 'bronze' not in badges:
+            badges.append('bronze')
+        if new_points >= 100 and 'silver' not in badges:
+            badges.append('silver')
+        if new_points >= 200 and 'gold' not in badges:
+            badges.append('gold')
+        
+        # Sort badges
+        badge_order = {'bronze': 1, 'silver': 2, 'gold': 3}
+        badges.sort(key=lambda x: badge_order.get(x, 0))
+        return new_points, badges
+    
     @staticmethod
     def update_points(user_id, points_to_add):
         try:
             # First get current user data
             user = User.find_by_id(user_id)
             if user:
-                current_points = user.get('points', 0)
-                new_points = current_points + points_to_add
-                badges = user.get('badges', [])
-                
-                # Award badges based on points
-                if new_points >= 50 and 'bronze' not in badges:
-                    badges.append('bronze')
-                if new_points >= 100 and 'silver' not in badges:
-                    badges.append('silver')
-                if new_points >= 200 and 'gold' not in badges:
-                    badges.append('gold')
-                
-                # Sort badges
-                badge_order = {'bronze': 1, 'silver': 2, 'gold': 3}
-                badges.sort(key=lambda x: badge_order.get(x, 0))
+                new_points, badges = User.apply_points(user, points_to_add)
                 
                 # Update user
-                response = supabase.table('users').update({
+                response = execute_write(supabase.table('users').update({
                     'points': new_points, 
                     'badges': badges
-                }).eq('id', user_id).execute()
+                }).eq('id', user_id))
                 
                 return new_points
             return 0
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error updating points: {e}")
+            logger.exception("Error updating points")
             return 0
     
+    @staticmethod
+    def award_points_bulk(points_by_user):
+        """
+        Add points to many users: one fetch for all of them, then one update per user
+        (sent concurrently). Returns {user_id: new_points}.
+        """
+        if not points_by_user:
+            return {}
+        try:
+            response = execute_read(supabase.table('users').select('id, points, badges')\
+                .in_('id', list(points_by_user)))
+            
+            updates = {}
+            for user in response.data:
+                new_points, badges = User.apply_points(user, points_by_user[user['id']])
+                updates[user['id']] = (new_points, badges)
+            
+            def write(user_id, new_points, badges):
+                return lambda: execute_write(supabase.table('users').update({
+                    'points': new_points,
+                    'badges': badges
+                }).eq('id', user_id))
+            
+            run_parallel({user_id: write(user_id, *update) for user_id, update in updates.items()})
+            return {user_id: update[0] for user_id, update in updates.items()}
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            logger.exception("Error awarding points in bulk")
+            return {}
+    
     @staticmethod
     def get_leaderboard(limit=10):
         try:
-            response = supabase.table('users').select('name, points, badges')\
+            response = execute_read(supabase.table('users').select('name, points, badges')\
                 .eq('role', 'student')\
                 .order('points', desc=True)\
-                .limit(limit)\
-                .execute()
+                .limit(limit))
             return response.data
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
-            print(f"Error getting leaderboard: {e}")
+            logger.exception("Error getting leaderboard")
             return []
\ No newline at end of file
@@ -0,0 +1,50 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from supabase_client import POOL_MAX_CONNECTIONS
+
+# Keep below the HTTP pool size so fan-out never queues on a free connection
+MAX_WORKERS = int(os.getenv('DB_EXECUTOR_WORKERS', max(2, POOL_MAX_CONNECTIONS // 2)))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='supabase-query')
+_local = threading.local()
+
+
+def _run_in_worker(func):
+    _local.in_worker = True
+    try:
+        return func()
+    finally:
+        _local.in_worker = False
+
+
+def run_parallel(calls):
+    """
+    Run independent Supabase calls concurrently.
+
+    calls maps a name to a zero-argument callable; returns a dict of the same
+    names to their results. The first exception raised by any call is re-raised
+    after all calls have finished. Nested groups (a call that itself uses
+    run_parallel) run serially so the pool can never deadlock on itself.
+    """
+    if getattr(_local, 'in_worker', False) or len(calls) < 2:
+        return {name: func() for name, func in calls.items()}
+
+    # Each call runs in a copy of the caller's context so request-scoped log fields follow it
+    futures = {
+        name: _executor.submit(contextvars.copy_context().run, _run_in_worker, func)
+        for name, func in calls.items()
+    }
+    results = {}
+    error = None
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            if error is None:
+                error = e
+    if error is not None:
+        raise error
+    return results
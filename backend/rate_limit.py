@@ -0,0 +1,175 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, request
+from flask_jwt_extended import get_jwt_identity
+
+from app_logging import get_logger
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = get_logger('rate_limit')
+
+# Token bucket per identity: BURST tokens, refilled at RATE tokens/second.
+# Each route spends its own cost, so one issue creation weighs as much as many cheap reads.
+RATE_LIMIT_RATE = float(os.getenv('RATE_LIMIT_RATE', 1))
+RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', 30))
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() != 'false'
+
+# Concurrency cap on the expensive analysis stage of issue creation
+ANALYSIS_MAX_CONCURRENT = int(os.getenv('ANALYSIS_MAX_CONCURRENT', 4))
+ANALYSIS_MAX_QUEUE = int(os.getenv('ANALYSIS_MAX_QUEUE', 8))
+ANALYSIS_QUEUE_TIMEOUT = float(os.getenv('ANALYSIS_QUEUE_TIMEOUT', 10))
+
+
+class MemoryBackend:
+    """Token buckets in process memory. Limits are per worker process."""
+    MAX_KEYS = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # least recently used first
+
+    def _evict(self, now, rate, burst):
+        # Buckets that have refilled completely carry no state worth keeping. Past
+        # MAX_KEYS the least recently used go even if not full, at worst handing
+        # an idle client a fresh burst; either way only the oldest few are touched.
+        full_after = burst / rate
+        while self._buckets:
+            key, (_, last) = next(iter(self._buckets.items()))
+            if now - last < full_after and len(self._buckets) <= self.MAX_KEYS:
+                break
+            del self._buckets[key]
+
+    def consume(self, key, cost, rate, burst):
+        """Spend cost tokens. Returns 0 if allowed, else seconds until it would be."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                wait = 0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (cost - tokens) / rate
+            self._evict(now, rate, burst)
+            return wait
+
+
+class RedisBackend:
+    """Token buckets shared by all workers through Redis (atomic Lua script)."""
+    SCRIPT = """
+    local burst = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + (now - ts) * rate)
+    local wait = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+    else
+        wait = (cost - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url):
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def consume(self, key, cost, rate, burst):
+        return float(self._script(keys=[f'ratelimit:{key}'], args=[burst, rate, cost]))
+
+
+def _create_backend():
+    url = os.getenv('RATE_LIMIT_REDIS_URL')
+    if url:
+        if redis is None:
+            logger.warning("RATE_LIMIT_REDIS_URL set but redis is not installed; using in-memory rate limits")
+        else:
+            return RedisBackend(url)
+    return MemoryBackend()
+
+
+backend = _create_backend()
+
+
+def _too_many(message, retry_after, status):
+    response = jsonify({'error': message})
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response, status
+
+
+def rate_limit(cost=1):
+    """
+    Charge cost tokens from the caller's bucket (JWT identity, else client IP) and
+    answer 429 with Retry-After when it is empty. Place below @jwt_required().
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not RATE_LIMIT_ENABLED:
+                return view(*args, **kwargs)
+            identity = get_jwt_identity() or request.remote_addr
+            try:
+                wait = backend.consume(identity, cost, RATE_LIMIT_RATE, RATE_LIMIT_BURST)
+            except Exception:
+                # A broken shared store must not take the API down with it
+                logger.warning("Rate limit backend error; allowing request", exc_info=True)
+                wait = 0
+            if wait > 0:
+                return _too_many('Too many requests, slow down', wait, 429)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class AdmissionGate:
+    """
+    Caps concurrent entries into an expensive stage. Up to max_queue callers may
+    wait (at most timeout seconds) for a slot; beyond that they are turned away
+    at once, so a burst cannot pile up every request thread behind the stage.
+    """
+    def __init__(self, max_concurrent, max_queue, timeout):
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+    def acquire(self):
+        if self._slots.acquire(blocking=False):
+            return True
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                return False
+            self._waiting += 1
+        try:
+            return self._slots.acquire(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def release(self):
+        self._slots.release()
+
+
+analysis_gate = AdmissionGate(ANALYSIS_MAX_CONCURRENT, ANALYSIS_MAX_QUEUE, ANALYSIS_QUEUE_TIMEOUT)
+
+
+def server_busy():
+    return _too_many('Server busy, please retry shortly', analysis_gate.timeout, 503)
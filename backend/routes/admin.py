@@ -1,7 +1,15 @@
-from flask import Blueprint, request, jsonify
+import uuid
+from functools import wraps
+from flask import Blueprint, Response, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.issue import Issue
 from models.user import User
+from http_cache import conditional
+from query_executor import run_parallel
+from events import broker, stream
+from serialization import RowFormatter, Field, parse_location
+from search_index import encode_cursor, decode_cursor
+from db_resilience import DatabaseUnavailable
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -10,51 +18,116 @@ def check_admin_role():
     user = User.find_by_id(user_id)
     return user and user.get('role') == 'admin'
 
-import json
+def admin_required(view):
+    # Goes above @conditional so a non-admin can never get a 304 for admin data
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not check_admin_role():
+            return jsonify({'error': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(value)
+        return True
+    except ValueError:
+        return False
+
+def _issue_user(issue):
+    # Supabase returns the joined 'user' as a dict, or None if not found
+    user_data = issue.get('user') or {}
+    return {
+        'name': user_data.get('name', 'Unknown'),
+        'email': user_data.get('email', 'Unknown')
+    }
+
+ADMIN_ISSUE_ROW = RowFormatter(
+    id='id',
+    description='description',
+    category='category',
+    urgency='urgency',
+    status='status',
+    location=Field('location', transform=parse_location),
+    image_data=Field('image_data'),
+    is_duplicate=Field('is_duplicate', default=False),
+    cluster_id=Field('cluster_id'),
+    canonical_id=Field('canonical_id'),
+    created_at='created_at',  # Already ISO string
+    user=_issue_user
+)
 
 @admin_bp.route('/issues', methods=['GET'])
 @jwt_required()
+@admin_required
+@conditional(Issue.get_last_modified)
 def get_all_issues():
+    try:
+        issues = Issue.find_all()
+        formatted_issues = ADMIN_ISSUE_ROW.format_all(issues)
+        
+        return jsonify({'issues': formatted_issues}), 200
+        
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+SEARCH_RESULT_ROW = RowFormatter(
+    id='id',
+    description='description',
+    category='category',
+    urgency='urgency',
+    status='status',
+    is_duplicate=Field('is_duplicate', default=False),
+    created_at='created_at',
+    rank='rank'
+)
+
+@admin_bp.route('/issues/search', methods=['GET'])
+@jwt_required()
+def search_issues():
     try:
         if not check_admin_role():
             return jsonify({'error': 'Admin access required'}), 403
         
-        issues = Issue.find_all()
-        formatted_issues = []
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Search query required'}), 400
         
-        for issue in issues:
-            # Handle joined user data
-            # Supabase returns 'user' as a dict or None if not found
-            user_data = issue.get('user') or {}
-            
-            # Parse location if it's a string
-            loc = issue.get('location', {})
-            if isinstance(loc, str):
-                try:
-                    # Replace single quotes with double quotes for valid JSON if needed
-                    loc = loc.replace("'", '"')
-                    loc = json.loads(loc)
-                except:
-                    loc = {}
-
-            formatted_issues.append({
-                'id': issue['id'],
-                'description': issue['description'],
-                'category': issue['category'],
-                'urgency': issue['urgency'],
-                'status': issue['status'],
-                'location': loc,
-                'image_data': issue.get('image_data'),
-                'is_duplicate': issue.get('is_duplicate', False),
-                'created_at': issue['created_at'], # Already ISO string
-                'user': {
-                    'name': user_data.get('name', 'Unknown'),
-                    'email': user_data.get('email', 'Unknown')
-                }
-            })
+        try:
+            limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        except ValueError:
+            return jsonify({'error': 'Invalid limit'}), 400
         
-        return jsonify({'issues': formatted_issues}), 200
+        after = None
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        
+        results = Issue.search(
+            query,
+            status=request.args.get('status'),
+            category=request.args.get('category'),
+            urgency=request.args.get('urgency'),
+            after=after,
+            limit=limit
+        )
+        
+        next_cursor = None
+        if len(results) == limit:
+            next_cursor = encode_cursor(results[-1]['rank'], results[-1]['id'])
+        
+        return jsonify({
+            'issues': SEARCH_RESULT_ROW.format_all(results),
+            'next_cursor': next_cursor
+        }), 200
         
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -62,7 +135,15 @@ def get_all_issues():
 @jwt_required()
 def update_issue_status(issue_id):
     try:
-        if not check_admin_role():
+        # Admin lookup and the issue fetch (to see if it's being resolved) are independent.
+        # Worker threads have no request context, so resolve the identity here.
+        user_id = get_jwt_identity()
+        results = run_parallel({
+            'user': lambda: User.find_by_id(user_id),
+            'issue': lambda: Issue.get_by_id(issue_id)
+        })
+        user = results['user']
+        if not (user and user.get('role') == 'admin'):
             return jsonify({'error': 'Admin access required'}), 403
         
         data = request.get_json()
@@ -71,11 +152,31 @@ def update_issue_status(issue_id):
         if new_status not in ['pending', 'in_progress', 'resolved']:
             return jsonify({'error': 'Invalid status'}), 400
         
-        # Get issue before update to check if it's being resolved
-        issue = Issue.get_by_id(issue_id)
+        issue = results['issue']
         was_resolved = issue and issue['status'] == 'resolved'
         
-        success = Issue.update_status(issue_id, new_status)
+        # Resolving a canonical issue resolves the rest of its duplicate cluster in the same write
+        if new_status == 'resolved' and issue and issue.get('canonical_id') == issue_id:
+            previous, updated_ids = Issue.update_status_bulk([issue_id], new_status)
+            if previous is None:
+                return jsonify({'error': 'Failed to update issue'}), 500
+            if issue_id not in previous:
+                return jsonify({'error': 'Issue not found'}), 404
+            
+            points_by_user = {}
+            for updated_id in updated_ids:
+                user_id = previous[updated_id]['user_id']
+                points_by_user[user_id] = points_by_user.get(user_id, 0) + 10
+            User.award_points_bulk(points_by_user)
+            
+            body = {'message': 'Status updated successfully'}
+            cascaded = [updated_id for updated_id in updated_ids if updated_id != issue_id]
+            if cascaded:
+                # Duplicates resolved along with their canonical issue
+                body['cascaded_issue_ids'] = cascaded
+            return jsonify(body), 200
+        
+        success = Issue.update_status(issue_id, new_status, issue['status'] if issue else None)
         
         if success:
             # Award points if issue is being resolved for the first time
@@ -86,16 +187,110 @@ def update_issue_status(issue_id):
         else:
             return jsonify({'error': 'Issue not found'}), 404
             
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@admin_bp.route('/dashboard', methods=['GET'])
+# One transaction per request; cascaded duplicates come on top of this
+MAX_BULK_ISSUES = 200
+
+@admin_bp.route('/issues/status', methods=['PUT'])
 @jwt_required()
-def get_dashboard_stats():
+def bulk_update_issue_status():
     try:
         if not check_admin_role():
             return jsonify({'error': 'Admin access required'}), 403
         
+        data = request.get_json() or {}
+        new_status = data.get('status')
+        issue_ids = data.get('issue_ids')
+        
+        if new_status not in ['pending', 'in_progress', 'resolved']:
+            return jsonify({'error': 'Invalid status'}), 400
+        
+        if not isinstance(issue_ids, list) or not issue_ids or not all(isinstance(i, str) for i in issue_ids):
+            return jsonify({'error': 'issue_ids must be a non-empty list of ids'}), 400
+        
+        if len(issue_ids) > MAX_BULK_ISSUES:
+            return jsonify({'error': f'At most {MAX_BULK_ISSUES} issues per request'}), 400
+        
+        issue_ids = list(dict.fromkeys(issue_ids))
+        # Ids that are not uuids cannot exist; sending them would fail the whole batch
+        valid_ids = [issue_id for issue_id in issue_ids if _is_uuid(issue_id)]
+        previous, updated_ids = Issue.update_status_bulk(valid_ids, new_status) if valid_ids else ({}, [])
+        if previous is None:
+            return jsonify({'error': 'Failed to update issues'}), 500
+        
+        # Award points once per user for every issue resolved for the first time,
+        # duplicates resolved through their canonical issue included
+        updated = set(updated_ids)
+        requested = set(issue_ids)
+        if new_status == 'resolved':
+            points_by_user = {}
+            for issue_id in updated_ids:
+                user_id = previous[issue_id]['user_id']
+                points_by_user[user_id] = points_by_user.get(user_id, 0) + 10
+            User.award_points_bulk(points_by_user)
+        
+        results = []
+        for issue_id in issue_ids:
+            if issue_id not in previous:
+                result = 'not_found'
+            elif issue_id in updated:
+                result = 'updated'
+            else:
+                result = 'unchanged'
+            results.append({
+                'id': issue_id,
+                'result': result,
+                'previous_status': previous[issue_id]['status'] if issue_id in previous else None
+            })
+        
+        return jsonify({
+            'message': f'{len(updated_ids)} issues updated',
+            'results': results,
+            # Duplicates resolved along with their canonical issue
+            'cascaded_issue_ids': [issue_id for issue_id in updated_ids if issue_id not in requested]
+        }), 200
+        
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+CLUSTER_ROW = RowFormatter(
+    cluster_id='cluster_id',
+    canonical_id='canonical_id',
+    description='description',
+    category='category',
+    urgency='urgency',
+    status='status',
+    member_count='member_count',
+    open_count='open_count',
+    latest_report_at='latest_report_at'
+)
+
+@admin_bp.route('/clusters', methods=['GET'])
+@jwt_required()
+@admin_required
+@conditional(Issue.get_last_modified)
+def get_duplicate_clusters():
+    try:
+        clusters = Issue.get_clusters()
+        return jsonify({'clusters': CLUSTER_ROW.format_all(clusters)}), 200
+        
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+@admin_required
+@conditional(Issue.get_last_modified)
+def get_dashboard_stats():
+    try:
         stats = Issue.get_analytics()
         
         return jsonify({
@@ -106,5 +301,34 @@ def get_dashboard_stats():
             'high_priority_issues': stats.get('high_priority', 0)
         }), 200
         
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_events():
+    """
+    Server-Sent Events feed of issue_created / status_changed events for live dashboards.
+    EventSource cannot set headers, so the JWT may also be passed as ?jwt=<token>.
+    """
+    if not check_admin_role():
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    subscription = broker.subscribe(last_event_id)
+    if subscription is None:
+        response = jsonify({'error': 'Too many live connections, fall back to polling'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    response = Response(stream(*subscription), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
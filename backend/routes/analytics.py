@@ -1,76 +1,86 @@
+from functools import wraps
 from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.issue import Issue
 from models.user import User
+from http_cache import conditional
+from serialization import RowFormatter, Field
+from db_resilience import DatabaseUnavailable
 
 analytics_bp = Blueprint('analytics', __name__)
 
+STAT_ROW = RowFormatter(
+    name=Field('_id', transform=str.title, required=True),
+    value='count'
+)
+
+def _trend_date(trend):
+    date_obj = trend['_id']
+    return f"{date_obj['year']}-{date_obj['month']:02d}-{date_obj['day']:02d}"
+
+TREND_ROW = RowFormatter(
+    date=_trend_date,
+    count='count'
+)
+
 def check_admin_role():
     user_id = get_jwt_identity()
     user = User.find_by_id(user_id)
     return user and user.get('role') == 'admin'
 
+def admin_required(view):
+    # Goes above @conditional so a non-admin can never get a 304 for admin data
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not check_admin_role():
+            return jsonify({'error': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
 @analytics_bp.route('/categories', methods=['GET'])
 @jwt_required()
+@admin_required
+@conditional(Issue.get_last_modified)
 def get_category_analytics():
     try:
-        if not check_admin_role():
-            return jsonify({'error': 'Admin access required'}), 403
-        
         category_stats = Issue.get_category_stats()
-        formatted_stats = []
-        
-        for stat in category_stats:
-            formatted_stats.append({
-                'name': stat['_id'].title(),
-                'value': stat['count']
-            })
+        formatted_stats = STAT_ROW.format_all(category_stats)
         
         return jsonify({'categories': formatted_stats}), 200
         
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @analytics_bp.route('/urgency', methods=['GET'])
 @jwt_required()
+@admin_required
+@conditional(Issue.get_last_modified)
 def get_urgency_analytics():
     try:
-        if not check_admin_role():
-            return jsonify({'error': 'Admin access required'}), 403
-        
         urgency_stats = Issue.get_urgency_stats()
-        formatted_stats = []
-        
-        for stat in urgency_stats:
-            formatted_stats.append({
-                'name': stat['_id'].title(),
-                'value': stat['count']
-            })
+        formatted_stats = STAT_ROW.format_all(urgency_stats)
         
         return jsonify({'urgency': formatted_stats}), 200
         
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @analytics_bp.route('/trends', methods=['GET'])
 @jwt_required()
+@admin_required
+@conditional(Issue.get_last_modified)
 def get_trend_analytics():
     try:
-        if not check_admin_role():
-            return jsonify({'error': 'Admin access required'}), 403
-        
         trend_data = Issue.get_trend_data()
-        formatted_trends = []
-        
-        for trend in trend_data:
-            date_obj = trend['_id']
-            date_str = f"{date_obj['year']}-{date_obj['month']:02d}-{date_obj['day']:02d}"
-            formatted_trends.append({
-                'date': date_str,
-                'count': trend['count']
-            })
+        formatted_trends = TREND_ROW.format_all(trend_data)
         
         return jsonify({'trends': formatted_trends}), 200
         
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -1,10 +1,18 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from models.user import User
+from serialization import RowFormatter, Field
+from db_resilience import DatabaseUnavailable
 import re
 
 auth_bp = Blueprint('auth', __name__)
 
+LEADERBOARD_ROW = RowFormatter(
+    name='name',
+    points=Field('points', default=0),
+    badges=Field('badges', default=[])
+)
+
 def validate_email(email):
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return re.match(pattern, email) is not None
@@ -44,6 +52,8 @@ def register():
             }
         }), 201
         
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -78,6 +88,8 @@ def login():
             }
         }), 200
         
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -102,6 +114,8 @@ def get_profile():
             }
         }), 200
         
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -109,17 +123,13 @@ def get_profile():
 def get_leaderboard():
     try:
         leaderboard = User.get_leaderboard()
-        formatted_leaderboard = []
-        
-        for i, user in enumerate(leaderboard):
-            formatted_leaderboard.append({
-                'rank': i + 1,
-                'name': user['name'],
-                'points': user.get('points', 0),
-                'badges': user.get('badges', [])
-            })
+        formatted_leaderboard = LEADERBOARD_ROW.format_all(leaderboard)
+        for i, entry in enumerate(formatted_leaderboard):
+            entry['rank'] = i + 1
         
         return jsonify({'leaderboard': formatted_leaderboard}), 200
         
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -2,15 +2,71 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.issue import Issue
 from models.user import User
-from ai.analyzer import analyze_sentiment, categorize_issue, check_duplicate
+from ai.analyzer import analyze_sentiment, categorize_issue, find_duplicates
+from serialization import RowFormatter, Field
+from rate_limit import rate_limit, analysis_gate, server_busy
+from query_executor import run_parallel
+from app_logging import get_logger, stage
+from db_resilience import DatabaseUnavailable
+import base64
 import json
+import re
+import uuid
 
 issues_bp = Blueprint('issues', __name__)
+logger = get_logger('routes.issues')
+
+MY_REPORT_ROW = RowFormatter(
+    id='id',
+    description='description',
+    category='category',
+    urgency='urgency',
+    status='status',
+    location=Field('location', default={}),
+    is_duplicate=Field('is_duplicate', default=False),
+    created_at='created_at',
+    updated_at=Field('updated_at'),
+    points_earned=lambda issue: 10 if issue['status'] == 'resolved' else 0
+)
+
+# Timestamps as PostgREST renders timestamptz. Checked by pattern rather than with
+# datetime.fromisoformat, which before Python 3.11 rejects trimmed fractional seconds.
+SYNC_TIMESTAMP = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d{1,6})?(Z|[+-]\d{2}(:?\d{2})?)?')
+
+EMPTY_SYNC_CURSOR = {'u': '1970-01-01T00:00:00+00:00', 'i': '00000000-0000-0000-0000-000000000000', 't': None}
+
+def decode_sync_cursor(value):
+    # u and i end up inside a PostgREST filter string, so both must parse as what
+    # they claim to be. u is kept verbatim: it is compared as a string with the
+    # updated_at values Supabase returns.
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(value.encode('ascii')))
+        if not isinstance(cursor, dict):
+            raise ValueError
+        if not SYNC_TIMESTAMP.fullmatch(cursor['u']):
+            raise ValueError
+        if cursor.get('t') is not None and not SYNC_TIMESTAMP.fullmatch(cursor['t']):
+            raise ValueError
+        return {'u': cursor['u'], 'i': str(uuid.UUID(cursor['i'])), 't': cursor.get('t')}
+    except Exception:
+        raise ValueError('Invalid sync cursor')
+
+def advance_sync_cursor(cursor, issues, tombstones):
+    """Opaque cursor past the newest (updated_at, id) and tombstone seen so far"""
+    cursor = dict(cursor)
+    for issue in issues:
+        if (issue['updated_at'], issue['id']) > (cursor['u'], cursor['i']):
+            cursor['u'], cursor['i'] = issue['updated_at'], issue['id']
+    for tombstone in tombstones:
+        if cursor['t'] is None or tombstone['deleted_at'] > cursor['t']:
+            cursor['t'] = tombstone['deleted_at']
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode('utf-8')).decode('ascii')
 
 # ---------------- CREATE ISSUE ---------------- #
 
 @issues_bp.route('/create', methods=['POST'])
 @jwt_required()
+@rate_limit(cost=10)
 def create_issue():
     try:
         user_id = get_jwt_identity()
@@ -24,7 +80,7 @@ def create_issue():
             return jsonify({'error': 'Admins cannot report issues'}), 403
 
         data = request.get_json()
-        print(f"Received issue creation request for user: {user_id}")
+        logger.debug("Received issue creation request")
 
         # Prevent empty JSON crash
         if not data:
@@ -33,48 +89,70 @@ def create_issue():
         description = data.get('description', '').strip()
         image_data = data.get('image')
         if image_data:
-            print(f"Image data received: {len(image_data)} characters")
+            logger.debug("Image data received", extra={'image_chars': len(image_data)})
         location = data.get('location', {})
 
         if not description:
             return jsonify({'error': 'Description required'}), 400
 
-        # AI
-        urgency = analyze_sentiment(description)
-        category = categorize_issue(description)
-
-        # Duplicate check (safe)
-        existing = Issue.get_all_descriptions() or []
-        is_duplicate = check_duplicate(description, existing)
-        print(f"AI Analysis Result - Urgency: {urgency}, Category: {category}, Is Duplicate: {is_duplicate}")
+        # AI + duplicate check is the expensive stage; cap how many run at once
+        if not analysis_gate.acquire():
+            return server_busy()
+        try:
+            with stage('analysis'):
+                urgency = analyze_sentiment(description)
+                category = categorize_issue(description)
+
+            # Duplicate check (safe)
+            with stage('duplicates'):
+                candidates = Issue.get_duplicate_candidates() or []
+                matches = find_duplicates(description, [c['description'] for c in candidates])
+        finally:
+            analysis_gate.release()
+
+        # Join (and if needed merge) the clusters of the issues this one duplicates
+        is_duplicate = bool(matches)
+        cluster_id = canonical_id = None
+        if is_duplicate:
+            with stage('clusters'):
+                cluster_id, canonical_id = Issue.join_clusters([candidates[i] for i in matches])
+        logger.debug("AI analysis result", extra={
+            'urgency': urgency, 'category': category, 'is_duplicate': is_duplicate
+        })
 
         # Create issue (NO json.dumps)
-        issue_id = Issue.create_issue(
-            user_id=user_id,
-            description=description,
-            image_data=image_data,
-            location=location,
-            category=category,
-            urgency=urgency,
-            is_duplicate=is_duplicate
-        )
+        with stage('db_insert'):
+            issue_id = Issue.create_issue(
+                user_id=user_id,
+                description=description,
+                image_data=image_data,
+                location=location,
+                category=category,
+                urgency=urgency,
+                is_duplicate=is_duplicate,
+                cluster_id=cluster_id,
+                canonical_id=canonical_id
+            )
 
         if not issue_id:
-            print("Error: Failed to save issue to database")
+            logger.error("Failed to save issue to database")
             return jsonify({'error': 'Failed to create issue'}), 500
 
-        print(f"Issue created successfully with ID: {issue_id}")
+        logger.info("Issue created", extra={'issue_id': issue_id, 'category': category, 'urgency': urgency})
 
         return jsonify({
             "message": "Issue reported successfully",
             "issue_id": issue_id,
             "urgency": urgency,
             "category": category,
-            "is_duplicate": is_duplicate
+            "is_duplicate": is_duplicate,
+            "canonical_id": canonical_id
         }), 201
 
-    except Exception as e:
-        print("Create Issue Error:", e)
+    except DatabaseUnavailable:
+        raise
+    except Exception:
+        logger.exception("Create Issue Error")
         return jsonify({'error': 'Server error'}), 500
 
 
@@ -82,6 +160,7 @@ def create_issue():
 
 @issues_bp.route('/my-reports', methods=['GET'])
 @jwt_required()
+@rate_limit(cost=1)
 def get_my_reports():
     try:
         user_id = get_jwt_identity()
@@ -93,27 +172,42 @@ def get_my_reports():
         if user.get('role') == 'admin':
             return jsonify({'error': 'Admins do not have personal reports'}), 403
 
-        issues = Issue.find_by_user(user_id)
-
-        formatted = []
-
-        for issue in issues:
-            formatted.append({
-                'id': issue['id'],
-                'description': issue['description'],
-                'category': issue['category'],
-                'urgency': issue['urgency'],
-                'status': issue['status'],
-                'location': issue.get('location', {}),
-                'is_duplicate': issue.get('is_duplicate', False),
-                'created_at': issue['created_at'],
-                'points_earned': 10 if issue['status'] == 'resolved' else 0
+        # Delta sync: with ?since=<cursor> only issues changed after it, plus tombstones
+        since = request.args.get('since')
+        if since:
+            try:
+                cursor = decode_sync_cursor(since)
+            except ValueError:
+                return jsonify({'error': 'Invalid sync cursor'}), 400
+            issues = Issue.find_changed_by_user(user_id, cursor['u'], cursor['i'])
+            tombstones = Issue.find_tombstones(user_id, cursor['t'])
+            if issues is None or tombstones is None:
+                return jsonify({'error': 'Server error'}), 500
+        else:
+            cursor = dict(EMPTY_SYNC_CURSOR)
+            results = run_parallel({
+                'issues': lambda: Issue.find_by_user(user_id),
+                # Archived issues never change again, so only full fetches include them
+                'archived': lambda: Issue.find_archived_by_user(user_id),
+                # Only the newest tombstone matters here: it seeds the cursor
+                'tombstones': lambda: Issue.find_tombstones(user_id, latest_only=True) or []
             })
+            issues = results['issues'] + results['archived']
+            tombstones = results['tombstones']
 
-        return jsonify({'issues': formatted}), 200
+        formatted = MY_REPORT_ROW.format_all(issues)
 
-    except Exception as e:
-        print("My Reports Error:", e)
+        return jsonify({
+            'issues': formatted,
+            'removed': [t['issue_id'] for t in tombstones] if since else [],
+            'cursor': advance_sync_cursor(cursor, issues, tombstones),
+            'delta': bool(since)
+        }), 200
+
+    except DatabaseUnavailable:
+        raise
+    except Exception:
+        logger.exception("My Reports Error")
         return jsonify({'error': 'Server error'}), 500
 
 
@@ -121,6 +215,7 @@ def get_my_reports():
 
 @issues_bp.route('/<issue_id>/resolve', methods=['PUT'])
 @jwt_required()
+@rate_limit(cost=2)
 def resolve_issue(issue_id):
     try:
         user_id = get_jwt_identity()
@@ -135,11 +230,13 @@ def resolve_issue(issue_id):
 
         # Award points ONLY once
         if issue['status'] != 'resolved':
-            Issue.update_status(issue_id, 'resolved')
+            Issue.update_status(issue_id, 'resolved', issue['status'])
             User.update_points(issue['user_id'], 10)
 
         return jsonify({'message': 'Issue resolved successfully'}), 200
 
-    except Exception as e:
-        print("Resolve Error:", e)
+    except DatabaseUnavailable:
+        raise
+    except Exception:
+        logger.exception("Resolve Error")
         return jsonify({'error': 'Server error'}), 500
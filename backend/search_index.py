@@ -0,0 +1,107 @@
+import base64
+import heapq
+import math
+import re
+import threading
+import uuid
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'that', 'the', 'there', 'this', 'to', 'was', 'were', 'with'
+}
+SEARCH_COLUMNS = 'id, description, category, urgency, status, is_duplicate, created_at'
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or '').lower()) if t not in STOP_WORDS]
+
+
+def encode_cursor(rank, issue_id):
+    return base64.urlsafe_b64encode(f"{rank!r}|{issue_id}".encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """(rank, id) from an opaque cursor; raises ValueError if it is malformed."""
+    try:
+        rank, issue_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|', 1)
+        # The id is cast to uuid by search_issues(); check it here so a bad cursor is a 400
+        return float(rank), str(uuid.UUID(issue_id))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+class InvertedIndex:
+    """
+    In-memory full-text index over issue descriptions, for development without the
+    Postgres search_issues function. Results and pagination mirror it: AND semantics
+    over query terms, ranked by tf-idf, keyset-paginated on (rank desc, id desc).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = defaultdict(dict)  # term -> {issue_id: term frequency}
+        self._docs = {}                     # issue_id -> row (without description terms)
+        self.loaded = False
+
+    def add(self, issue):
+        with self._lock:
+            self._remove(issue['id'])
+            counts = defaultdict(int)
+            for term in tokenize(issue.get('description')):
+                counts[term] += 1
+            for term, tf in counts.items():
+                self._postings[term][issue['id']] = tf
+            self._docs[issue['id']] = {k: issue.get(k) for k in SEARCH_COLUMNS.split(', ')}
+
+    def _remove(self, issue_id):
+        doc = self._docs.pop(issue_id, None)
+        if doc is None:
+            return
+        for term in set(tokenize(doc.get('description'))):
+            postings = self._postings.get(term)
+            if postings:
+                postings.pop(issue_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def set_status(self, issue_id, status):
+        with self._lock:
+            if issue_id in self._docs:
+                self._docs[issue_id]['status'] = status
+
+    def load(self, issues):
+        for issue in issues:
+            self.add(issue)
+        self.loaded = True
+
+    def search(self, query, filters=None, after=None, limit=20):
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        filters = {k: v for k, v in (filters or {}).items() if v}
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+            postings.sort(key=len)
+            total = len(self._docs)
+            candidates = set(postings[0]).intersection(*postings[1:])
+
+            weighted = [(p, math.log(1 + total / len(p))) for p in postings]
+
+            results = []
+            for issue_id in candidates:
+                doc = self._docs[issue_id]
+                if filters and any(doc.get(k) != v for k, v in filters.items()):
+                    continue
+                rank = sum(p[issue_id] * idf for p, idf in weighted)
+                if after and (rank, issue_id) >= after:
+                    continue
+                results.append((rank, issue_id))
+
+            top = heapq.nlargest(limit, results)
+            return [dict(self._docs[issue_id], rank=rank) for rank, issue_id in top]
+
+
+local_index = InvertedIndex()
@@ -0,0 +1,107 @@
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson. Serializes straight to bytes and skips
+    key sorting; types orjson can't handle go through DefaultJSONProvider.default.
+    """
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = orjson.OPT_NON_STR_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option),
+            mimetype=self.mimetype
+        )
+
+
+def init_json(app):
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    else:
+        print("orjson not installed; using the standard json module")
+
+
+def loads(s):
+    return orjson.loads(s) if orjson is not None else json.loads(s)
+
+
+def parse_location(value):
+    """Location as a dict; location is a text column, so most rows hold a string"""
+    if isinstance(value, str):
+        try:
+            # Older rows were stored as Python reprs; single quotes -> valid JSON
+            return loads(value.replace("'", '"'))
+        except ValueError:
+            return {}
+    return value if value is not None else {}
+
+
+class Field:
+    """Output field read from source (a column name) with an optional default and transform."""
+    def __init__(self, source, default=None, transform=None, required=False):
+        self.source = source
+        self.default = default
+        self.transform = transform
+        self.required = required
+
+
+class RowFormatter:
+    """
+    Declarative row -> response dict mapping, compiled once into a single function.
+
+    Each keyword maps an output key to either a column name (required, row[col]),
+    a Field, or a callable taking the whole row. The generated function builds the
+    output dict in one literal, with no per-field dispatch at request time.
+    Defaults are shared between rows and must not be mutated.
+    """
+    def __init__(self, **fields):
+        env = {}
+        items = []
+        for i, (key, spec) in enumerate(fields.items()):
+            if isinstance(spec, str):
+                spec = Field(spec, required=True)
+            if isinstance(spec, Field):
+                if spec.required:
+                    expr = f"row[{spec.source!r}]"
+                else:
+                    env[f'_d{i}'] = spec.default
+                    expr = f"row.get({spec.source!r}, _d{i})"
+                if spec.transform is not None:
+                    env[f'_t{i}'] = spec.transform
+                    expr = f"_t{i}({expr})"
+            elif callable(spec):
+                env[f'_f{i}'] = spec
+                expr = f"_f{i}(row)"
+            else:
+                raise TypeError(f"Unsupported field spec for {key!r}: {spec!r}")
+            items.append(f"{key!r}: {expr}")
+
+        source = "def format_row(row):\n    return {" + ", ".join(items) + "}\n"
+        exec(compile(source, '<RowFormatter>', 'exec'), env)
+        self.format = env['format_row']
+        self.keys = tuple(fields)
+
+    def __call__(self, row):
+        return self.format(row)
+
+    def format_all(self, rows):
+        return list(map(self.format, rows))
@@ -1,4 +1,5 @@
 import os
+import httpx
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
@@ -10,4 +11,37 @@ key: str = os.environ.get("SUPABASE_KEY")
 if not url or not key:
     raise ValueError("Supabase URL and Key must be provided in .env file")
 
-supabase: Client = create_client(url, key)
+# Shared keep-alive pool used by every request thread (and the query executor)
+POOL_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_POOL_MAX_CONNECTIONS", 20))
+POOL_MAX_KEEPALIVE = int(os.environ.get("SUPABASE_POOL_MAX_KEEPALIVE", 10))
+POOL_KEEPALIVE_EXPIRY = float(os.environ.get("SUPABASE_POOL_KEEPALIVE_EXPIRY", 30))
+CONNECT_TIMEOUT = float(os.environ.get("SUPABASE_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.environ.get("SUPABASE_READ_TIMEOUT", 15))
+POOL_TIMEOUT = float(os.environ.get("SUPABASE_POOL_TIMEOUT", 5))
+
+http_client = httpx.Client(
+    limits=httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+        keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+    ),
+    timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT, pool=POOL_TIMEOUT),
+    follow_redirects=True,
+)
+
+
+def _client_options():
+    try:
+        from supabase import ClientOptions
+    except ImportError:
+        return None
+    try:
+        return ClientOptions(httpx_client=http_client)
+    except TypeError:
+        # Older supabase-py without httpx_client support: keep its own session, bound the wait at least
+        print("supabase-py does not accept a custom httpx client; using default transport")
+        return ClientOptions(postgrest_client_timeout=READ_TIMEOUT)
+
+
+options = _client_options()
+supabase: Client = create_client(url, key, options=options) if options else create_client(url, key)
@@ -31,3 +31,245 @@ create table if not exists issues (
 -- Create indexes for performance
 create index if not exists issues_user_id_idx on issues(user_id);
 create index if not exists issues_status_idx on issues(status);
+create index if not exists issues_updated_at_idx on issues(updated_at desc);
+
+-- Full-text search over descriptions (GET /api/admin/issues/search)
+alter table issues add column if not exists search_vector tsvector
+  generated always as (to_tsvector('english', coalesce(description, ''))) stored;
+create index if not exists issues_search_vector_idx on issues using gin(search_vector);
+
+-- Ranked search with optional filters and keyset pagination on (rank desc, id desc)
+create or replace function search_issues(
+  q text,
+  p_status text default null,
+  p_category text default null,
+  p_urgency text default null,
+  after_rank real default null,
+  after_id uuid default null,
+  page_size int default 20
+)
+returns table (
+  id uuid,
+  description text,
+  category text,
+  urgency text,
+  status text,
+  is_duplicate boolean,
+  created_at timestamp with time zone,
+  rank real
+)
+language sql stable
+as $$
+  with query as (select websearch_to_tsquery('english', q) as tsq)
+  select * from (
+    select i.id, i.description, i.category, i.urgency, i.status, i.is_duplicate, i.created_at,
+           ts_rank(i.search_vector, query.tsq) as rank
+    from issues i, query
+    where i.search_vector @@ query.tsq
+      and (p_status is null or i.status = p_status)
+      and (p_category is null or i.category = p_category)
+      and (p_urgency is null or i.urgency = p_urgency)
+  ) ranked
+  where after_rank is null or (ranked.rank, ranked.id) < (after_rank, after_id)
+  order by ranked.rank desc, ranked.id desc
+  limit page_size;
+$$;
+
+-- Duplicate clusters: every issue points straight at its cluster root (the oldest
+-- issue in the cluster) and at the canonical issue admins triage
+alter table issues add column if not exists cluster_id uuid;
+-- No foreign key: a canonical issue can be archived together with its resolved duplicates
+alter table issues add column if not exists canonical_id uuid;
+alter table issues drop constraint if exists issues_canonical_id_fkey;
+update issues set cluster_id = id where cluster_id is null;
+update issues set canonical_id = cluster_id where canonical_id is null;
+create index if not exists issues_cluster_id_idx on issues(cluster_id);
+
+create or replace view issue_clusters as
+select
+  c.cluster_id,
+  c.canonical_id,
+  canon.description,
+  canon.category,
+  canon.urgency,
+  canon.status,
+  c.member_count,
+  c.open_count,
+  c.latest_report_at
+from (
+  select
+    cluster_id,
+    min(canonical_id::text)::uuid as canonical_id,
+    count(*) as member_count,
+    count(*) filter (where status <> 'resolved') as open_count,
+    max(created_at) as latest_report_at
+  from issues
+  group by cluster_id
+  having count(*) > 1
+) c
+join issues canon on canon.id = c.canonical_id;
+
+-- Sets status on a batch of issues in one statement; the ids travel in the JSON body,
+-- not the URL. Resolving a canonical issue resolves the rest of its duplicate cluster.
+-- Returns every requested issue that exists, plus the cascaded duplicates, with the
+-- status it had before and whether this call changed it.
+create or replace function update_issue_status_bulk(issue_ids uuid[], new_status text)
+returns table (
+  id uuid,
+  user_id uuid,
+  previous_status text,
+  updated boolean
+)
+language sql
+as $$
+  with requested as (
+    select i.id, i.user_id, i.status, i.cluster_id, i.canonical_id
+    from issues i
+    where i.id = any(issue_ids)
+  ), targets as (
+    select r.id, r.status from requested r
+    union
+    select m.id, m.status
+    from requested r
+    join issues m on m.cluster_id = r.cluster_id
+    where new_status = 'resolved' and r.canonical_id = r.id
+  ), changed as (
+    -- status <> new_status is re-checked against rows another admin changed meanwhile
+    update issues u
+    set status = new_status, updated_at = timezone('utc'::text, now())
+    from targets t
+    where u.id = t.id and u.status <> new_status
+    returning u.id, u.user_id, t.status as previous_status
+  )
+  select r.id, r.user_id, r.status, c.id is not null
+  from requested r
+  left join changed c on c.id = r.id
+  union all
+  select c.id, c.user_id, c.previous_status, true
+  from changed c
+  where not exists (select 1 from requested r where r.id = c.id);
+$$;
+
+-- Delta sync for My Reports: changed rows by (user_id, updated_at, id), deletions as tombstones
+create index if not exists issues_user_updated_idx on issues(user_id, updated_at, id);
+
+create table if not exists issue_tombstones (
+  issue_id uuid primary key,
+  user_id uuid,
+  deleted_at timestamp with time zone default timezone('utc'::text, now())
+);
+create index if not exists issue_tombstones_user_deleted_idx on issue_tombstones(user_id, deleted_at);
+-- Newest deletion is part of the conditional-GET version (Issue.get_last_modified)
+create index if not exists issue_tombstones_deleted_at_idx on issue_tombstones(deleted_at desc);
+
+create or replace function record_issue_tombstone() returns trigger
+language plpgsql as $$
+begin
+  -- Archival moves rows out of issues; those are not deletions for sync clients
+  if current_setting('campusfix.archiving', true) = 'on' then
+    return old;
+  end if;
+  insert into issue_tombstones (issue_id, user_id)
+  values (old.id, old.user_id)
+  on conflict (issue_id) do update set deleted_at = excluded.deleted_at;
+  return old;
+end;
+$$;
+
+drop trigger if exists issues_tombstone on issues;
+create trigger issues_tombstone after delete on issues
+  for each row execute function record_issue_tombstone();
+
+-- Every change must move updated_at or delta sync never sees it (e.g. cluster relabels)
+create or replace function touch_issue_updated_at() returns trigger
+language plpgsql as $$
+begin
+  new.updated_at := now();
+  return new;
+end;
+$$;
+
+drop trigger if exists issues_touch_updated_at on issues;
+create trigger issues_touch_updated_at before update on issues
+  for each row when (old.* is distinct from new.*)
+  execute function touch_issue_updated_at();
+
+-- Archive of resolved issues older than the hot window, plus daily rollups so
+-- analytics still count them. Filled by archive_resolved_issues() (archive_issues.py)
+create table if not exists issues_archive (
+  id uuid primary key,
+  user_id uuid,
+  description text,
+  image_data text,
+  location text,
+  category text,
+  urgency text,
+  status text,
+  is_duplicate boolean,
+  cluster_id uuid,
+  canonical_id uuid,
+  created_at timestamp with time zone,
+  updated_at timestamp with time zone,
+  archived_at timestamp with time zone default timezone('utc'::text, now())
+);
+create index if not exists issues_archive_user_idx on issues_archive(user_id, created_at desc);
+-- Newest archival is part of the conditional-GET version (Issue.get_last_modified)
+create index if not exists issues_archive_archived_at_idx on issues_archive(archived_at desc);
+
+create table if not exists issue_rollups (
+  day date not null,
+  category text not null default '',
+  urgency text not null default '',
+  status text not null default '',
+  issue_count int not null default 0,
+  primary key (day, category, urgency, status)
+);
+
+-- Moves one batch of at most batch_size clusters whose members are all resolved and
+-- older than older_than_days. Clusters move whole: archiving the canonical issue alone
+-- would leave live duplicates pointing at a row that is gone. Returns the number moved.
+create or replace function archive_resolved_issues(older_than_days int default 180, batch_size int default 5000)
+returns int
+language plpgsql
+as $$
+declare
+  moved int;
+begin
+  perform set_config('campusfix.archiving', 'on', true);
+
+  with clusters as (
+    select coalesce(cluster_id, id) as cluster_id
+    from issues
+    group by coalesce(cluster_id, id)
+    having bool_and(status = 'resolved'
+                    and created_at < timezone('utc'::text, now()) - make_interval(days => older_than_days))
+    order by min(created_at)
+    limit batch_size
+  ), candidates as (
+    select i.id
+    from issues i
+    join clusters c on c.cluster_id = coalesce(i.cluster_id, i.id)
+  ), moved_rows as (
+    delete from issues
+    where id in (select id from candidates) and status = 'resolved'
+    returning id, user_id, description, image_data, location, category, urgency, status,
+              is_duplicate, cluster_id, canonical_id, created_at, updated_at
+  ), archived as (
+    insert into issues_archive (id, user_id, description, image_data, location, category, urgency,
+                                status, is_duplicate, cluster_id, canonical_id, created_at, updated_at)
+    select * from moved_rows
+    on conflict (id) do nothing
+  ), rolled_up as (
+    insert into issue_rollups (day, category, urgency, status, issue_count)
+    select created_at::date, coalesce(category, ''), coalesce(urgency, ''), status, count(*)
+    from moved_rows
+    group by 1, 2, 3, 4
+    on conflict (day, category, urgency, status)
+      do update set issue_count = issue_rollups.issue_count + excluded.issue_count
+  )
+  select count(*) into moved from moved_rows;
+
+  perform set_config('campusfix.archiving', 'off', true);
+  return moved;
+end;
+$$;
@@ -1,6 +1,7 @@
 import Cookies from 'js-cookie'
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:5000'
+const MY_REPORTS_CACHE_KEY = 'my-reports-cache'
 
 class ApiClient {
   private baseURL: string
@@ -67,8 +68,63 @@ class ApiClient {
     })
   }
 
+  /**
+   * My reports, kept in localStorage and refreshed with delta sync:
+   * repeat visits only fetch issues changed since the stored cursor.
+   */
   async getMyReports() {
-    return this.request('/api/issues/my-reports')
+    // Keyed by user id: the JWT itself must never be copied into localStorage
+    let owner = ''
+    try {
+      owner = JSON.parse(Cookies.get('user') || '{}').id || ''
+    } catch {
+      owner = ''
+    }
+    let cache: { owner: string; cursor: string; issues: any[] } | null = null
+    try {
+      cache = JSON.parse(localStorage.getItem(MY_REPORTS_CACHE_KEY) || 'null')
+    } catch {
+      cache = null
+    }
+    if (cache && (!owner || cache.owner !== owner)) cache = null
+
+    let response
+    if (cache) {
+      try {
+        response = await this.request(`/api/issues/my-reports?since=${encodeURIComponent(cache.cursor)}`)
+      } catch {
+        // A cursor the server rejects would fail every visit: drop the cache and refetch in full
+        cache = null
+        try {
+          localStorage.removeItem(MY_REPORTS_CACHE_KEY)
+        } catch {
+          // Storage unavailable: the full fetch below overwrites it anyway
+        }
+      }
+    }
+    if (!response) {
+      response = await this.request('/api/issues/my-reports')
+    }
+
+    let issues: any[] = response.issues || []
+    if (cache && response.delta) {
+      const changed = new Set(issues.map((issue) => issue.id))
+      const removed = new Set(response.removed || [])
+      issues = cache.issues
+        .filter((issue) => !changed.has(issue.id) && !removed.has(issue.id))
+        .concat(issues)
+        .sort((a, b) => (a.created_at < b.created_at ? 1 : -1))
+    }
+
+    try {
+      localStorage.setItem(
+        MY_REPORTS_CACHE_KEY,
+        JSON.stringify({ owner, cursor: response.cursor, issues })
+      )
+    } catch {
+      // Storage full or unavailable: next visit simply does a full fetch
+    }
+    return { ...response, issues }
   }
 
   /**